@@ -0,0 +1,172 @@
+"""
+Registry / dedup benchmarks on a synthetic tree.
+
+    python -m benchmarks.run_benchmarks --files 20000 --out bench.jsonl
+
+Every measurement is appended to --out as one JSON line (benchmark, seconds,
+files, bytes, throughput, tree spec, git commit) so runs can be compared
+across commits.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCHMARKS = ("cold_scan", "warm_rescan", "churn_rescan", "update_registry",
+              "reconcile", "checkpoint_save", "find_duplicates")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def _timed(func, *args, **kwargs):
+    """(result, seconds) of one call with the scan chatter swallowed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark registry scans and dedup on a synthetic tree.")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--mean-size", type=int, default=64 * 1024, help="mean file size in bytes")
+    parser.add_argument("--size-sigma", type=float, default=1.0, help="log-normal size spread")
+    parser.add_argument("--dup-ratio", type=float, default=0.1)
+    parser.add_argument("--churn", type=float, default=0.01, help="fraction of files changed for churn_rescan")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--workdir", default=None, help="where the tree is generated (default: temp dir)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated tree")
+    parser.add_argument("--out", default="bench_results.jsonl")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="fileops_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    # keep the shared hash cache and progress bars out of the measurements
+    os.environ["HASH_CACHE_PATH"] = os.path.join(workdir, "hash_cache.db")
+    os.environ.setdefault("TQDM_DISABLE", "1")
+
+    from benchmarks.synthetic_tree import TreeSpec, apply_churn, generate_tree, tree_bytes
+    from functions.dedup import find_duplicate_groups
+    from functions.scan_stats import ScanStats
+    from md5_manager import (RegistryUpdate, get_path_index, load_registry, reconcile_missing,
+                             save_registry, scan_folder, update_registry_batch)
+
+    spec = TreeSpec(args.files, args.depth, args.fanout, args.mean_size, args.size_sigma,
+                    max(args.mean_size * 256, 1), args.dup_ratio, args.seed)
+    meta = {
+        "spec": spec._asdict(), "workers": args.workers, "commit": _git_commit(),
+        "python": platform.python_version(), "platform": sys.platform,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+    results = []
+
+    def record(name, seconds, files, n_bytes=None, repeat=0, **extra):
+        row = {"benchmark": name, "repeat": repeat, "seconds": round(seconds, 6), "files": files,
+               "files_per_sec": round(files / seconds, 1) if seconds else None}
+        if n_bytes is not None:
+            row["bytes"] = n_bytes
+            row["mb_per_sec"] = round(n_bytes / seconds / 1e6, 2) if seconds else None
+        row.update(extra)
+        row.update(meta)
+        results.append(row)
+        label = f"{name}/{extra['kind']}" if "kind" in extra else name
+        print(f"{label:<27} #{repeat}  {seconds:9.3f}s  {files:>8} files"
+              + (f"  {row['mb_per_sec']:>8} MB/s" if n_bytes is not None else ""))
+
+    try:
+        for repeat in range(args.repeat):
+            run_dir = os.path.join(workdir, f"run{repeat}")
+            shutil.rmtree(run_dir, ignore_errors=True)
+            tree = os.path.join(run_dir, "tree")
+            registry = os.path.join(run_dir, "registry.db")
+            paths, gen_seconds = _timed(generate_tree, tree, spec)
+            n_bytes = tree_bytes(tree, paths)
+            print(f"🌲 Generated {len(paths)} files ({n_bytes / 1e6:.1f} MB) in {gen_seconds:.1f}s under {tree}")
+
+            def scan(name, n_bytes=None, target=registry, incremental=False, **extra):
+                """Time one scan of the tree and record it with its skipped/rehashed/new counters."""
+                stats = ScanStats(name)
+                _, seconds = _timed(lambda: scan_folder(
+                    tree, load_registry(target), "prod", target, workers=args.workers,
+                    use_hash_cache=False, incremental=incremental, stats=stats))
+                counters = {k: v for k, v in stats.counters.get("prod", {}).items() if k != "files_seen"}
+                record(name, seconds, len(paths), n_bytes, repeat,
+                       kind="incremental" if incremental else "full", **counters, **extra)
+
+            if {"cold_scan", "warm_rescan", "churn_rescan"} & set(args.only):
+                scan("cold_scan", n_bytes)
+            if "warm_rescan" in args.only:
+                scan("warm_rescan")
+                scan("warm_rescan", incremental=True)
+            if "churn_rescan" in args.only:
+                # the incremental variant rescans its own copy of the same pre-churn registry
+                incremental_registry = os.path.join(run_dir, "registry_incremental.db")
+                with sqlite3.connect(registry) as src, sqlite3.connect(incremental_registry) as dst:
+                    src.backup(dst)
+                churn = apply_churn(tree, paths, args.churn, seed=args.seed + 1 + repeat, spec=spec)
+                scan("churn_rescan", churn=churn)
+                scan("churn_rescan", target=incremental_registry, incremental=True, churn=churn)
+
+            if {"update_registry", "reconcile", "checkpoint_save"} & set(args.only):
+                df = load_registry(registry)
+                known = dict(get_path_index(df).get("prod", {}))
+                rng = random.Random(args.seed)
+                sample = rng.sample(sorted(known), max(1, int(len(known) * args.churn))) if known else []
+
+                if "update_registry" in args.only:
+                    updates = [RegistryUpdate(f"{i:032x}", p, "prod", known[p].size, known[p].mtime)
+                               for i, p in enumerate(sample)]
+                    df, seconds = _timed(update_registry_batch, df, updates)
+                    record("update_registry", seconds, len(updates), None, repeat)
+                if "reconcile" in args.only:
+                    existing = set(get_path_index(df)["prod"]) - set(sample)
+                    df, seconds = _timed(reconcile_missing, df, existing, "prod")
+                    record("reconcile", seconds, len(sample), None, repeat, rows=len(df))
+                if "checkpoint_save" in args.only:
+                    _, seconds = _timed(save_registry, df, registry)
+                    record("checkpoint_save", seconds, len(get_path_index(df)["prod"]), None, repeat,
+                           kind="incremental", rows=len(df))
+                    full_target = os.path.join(run_dir, "full_save.db")
+                    _, seconds = _timed(save_registry, df, full_target)
+                    record("checkpoint_save", seconds, len(get_path_index(df)["prod"]), None, repeat,
+                           kind="full", rows=len(df))
+
+            if "find_duplicates" in args.only:
+                full_paths = [os.path.join(tree, p) for p in paths]
+                (_, duplicates), seconds = _timed(find_duplicate_groups, full_paths, args.workers)
+                record("find_duplicates", seconds, len(full_paths), tree_bytes(tree, paths), repeat,
+                       groups=len(duplicates))
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.out, "a", encoding="utf-8") as f:
+        for row in results:
+            f.write(json.dumps(row) + "\n")
+    print(f"✅ {len(results)} results appended to {args.out}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
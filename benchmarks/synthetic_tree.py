@@ -0,0 +1,112 @@
+import math
+import os
+import random
+from typing import Dict, List, NamedTuple
+
+# ==============================
+# Tree Spec
+# ==============================
+
+class TreeSpec(NamedTuple):
+    n_files: int = 2000
+    depth: int = 3              # directory levels below the root
+    fanout: int = 4             # subdirectories per directory
+    mean_size: int = 64 * 1024  # bytes; sizes are log-normal around this
+    size_sigma: float = 1.0     # log-normal spread (0 = every file mean_size)
+    max_size: int = 16 * 1024 * 1024
+    dup_ratio: float = 0.1      # fraction of files that copy an earlier file's content
+    seed: int = 0
+
+
+_FILLER = random.Random(0).randbytes(1024 * 1024)
+
+
+def _content(rng: random.Random, size: int) -> bytes:
+    """size bytes: a random 32-byte head (so files differ) then repeated filler."""
+    head = rng.randbytes(min(size, 32))
+    body = size - len(head)
+    return head + (_FILLER * (body // len(_FILLER) + 1))[:body]
+
+
+def _size(rng: random.Random, spec: TreeSpec) -> int:
+    if spec.size_sigma <= 0:
+        return spec.mean_size
+    # log-normal with the requested mean
+    mu = math.log(max(spec.mean_size, 1)) - spec.size_sigma ** 2 / 2
+    return min(int(rng.lognormvariate(mu, spec.size_sigma)), spec.max_size)
+
+
+def _directories(spec: TreeSpec) -> List[str]:
+    dirs = [""]
+    level = [""]
+    for d in range(spec.depth):
+        level = [f"{parent}d{d}_{i}/" for parent in level for i in range(spec.fanout)]
+        dirs.extend(level)
+    return dirs
+
+
+# ==============================
+# Generate / Churn
+# ==============================
+
+def generate_tree(root: str, spec: TreeSpec) -> List[str]:
+    """
+    Write a reproducible tree under root (same spec + seed = same paths and bytes).
+    Returns the "/"-separated relative paths of the files written.
+    """
+    rng = random.Random(spec.seed)
+    dirs = _directories(spec)
+    for d in dirs:
+        os.makedirs(os.path.join(root, d), exist_ok=True)
+
+    paths: List[str] = []
+    for i in range(spec.n_files):
+        rel_path = f"{rng.choice(dirs)}file_{i:07d}.bin"
+        if paths and rng.random() < spec.dup_ratio:
+            with open(os.path.join(root, rng.choice(paths)), "rb") as f:
+                data = f.read()
+        else:
+            data = _content(rng, _size(rng, spec))
+        with open(os.path.join(root, rel_path), "wb") as f:
+            f.write(data)
+        paths.append(rel_path)
+    return paths
+
+
+def apply_churn(root: str, paths: List[str], fraction: float, seed: int = 1,
+                spec: TreeSpec = TreeSpec()) -> Dict[str, int]:
+    """
+    Change fraction of the files under root, split evenly between in-place
+    modifications, deletions and new files. paths is updated in place.
+    Returns {"modified": n, "deleted": n, "added": n}.
+    """
+    rng = random.Random(seed)
+    n = max(1, int(len(paths) * fraction))
+    chosen = rng.sample(range(len(paths)), min(len(paths), n))
+    counts = {"modified": 0, "deleted": 0, "added": 0}
+
+    third = len(chosen) // 3
+    for i in chosen[:len(chosen) - third]:
+        full_path = os.path.join(root, paths[i])
+        with open(full_path, "r+b") as f:
+            f.write(rng.randbytes(16))
+        st = os.stat(full_path)
+        os.utime(full_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        counts["modified"] += 1
+    for i in sorted(chosen[len(chosen) - third:], reverse=True):
+        os.remove(os.path.join(root, paths.pop(i)))
+        counts["deleted"] += 1
+
+    dirs = _directories(spec)
+    for i in range(third):
+        rel_path = f"{rng.choice(dirs)}churn_{seed}_{i:07d}.bin"
+        os.makedirs(os.path.dirname(os.path.join(root, rel_path)) or root, exist_ok=True)
+        with open(os.path.join(root, rel_path), "wb") as f:
+            f.write(_content(rng, _size(rng, spec)))
+        paths.append(rel_path)
+        counts["added"] += 1
+    return counts
+
+
+def tree_bytes(root: str, paths: List[str]) -> int:
+    return sum(os.path.getsize(os.path.join(root, p)) for p in paths)
@@ -1,17 +1,23 @@
 import pandas as pd
 
+from functions.registry_query import RegistryQuery
+from md5_manager import load_registry
+
 def find_duplicate_prod_files(pickle_path: str, csv_path: str) -> pd.DataFrame:
     """
-    Load registry, filter for hashes with >1 Production file,
-    add a prod_count column,
+    Query the registry for hashes with >1 Production file,
+    load just those rows, add a prod_count column,
     return filtered df and save to CSV.
     """
-    df = pd.read_pickle(pickle_path)
+    # Hashes with >1 prod file, straight from the registry's indexes...
+    with RegistryQuery(pickle_path) as query:
+        prod_counts = pd.Series(
+            {md5: len(paths) for md5, paths in query.duplicates("prod")}, dtype="int64"
+        )
 
-    # Count prod files per hash
-    df["prod_count"] = df["filename_in_prod"].apply(
-        lambda s: len(s) if isinstance(s, set) else 0
-    )
+    # ...then the full rows of just those hashes
+    df = load_registry(pickle_path, md5s=prod_counts.index)
+    df["prod_count"] = prod_counts.reindex(df.index)
 
     # Filter for duplicates
     dupes_df = df[df["prod_count"] > 1].copy()
@@ -20,7 +26,7 @@ def find_duplicate_prod_files(pickle_path: str, csv_path: str) -> pd.DataFrame:
     for col in ["filename_in_prod", "filename_in_raw", "historical_prod", "historical_raw"]:
         if col in dupes_df.columns:
             dupes_df[col] = dupes_df[col].apply(
-                lambda x: "; ".join(sorted(map(str, x))) if isinstance(x, (set, list)) else x
+                lambda x: "; ".join(sorted(map(str, x))) if isinstance(x, (set, frozenset, list)) else x
             )
 
     dupes_df.to_csv(csv_path, index=True)  # index is md5
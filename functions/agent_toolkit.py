@@ -7,6 +7,10 @@ from typing import List, Tuple
 import csv
 from tqdm import tqdm
 
+from functions.exif_reader import exif_datetimes
+from functions.file_ops import CONFLICT_SKIP, MOVE, OpPlan, execute_plan
+from functions.op_logger import OpLogger
+
 def create_gallery(folder, output="gallery.html"):
     # Valid image extensions
     exts = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp")
@@ -43,7 +47,10 @@ def create_gallery(folder, output="gallery.html"):
 
 def folderize(target_folder,
               folder_name_override=False,
-              log_file="folderize_log.txt"):
+              log_file="folderize_log.txt",
+              workers=4,
+              journal_path=None,
+              log_format="text"):
     
     #print(f"DEBUG: target_folder type={type(target_folder)}, value={target_folder}")
 
@@ -58,10 +65,13 @@ def folderize(target_folder,
         os.makedirs(log_dir, exist_ok=True)
         log_file = os.path.join(log_dir, "folderize_log.txt")
 
-    def log(msg):
-        print(msg)
-        with open(log_file, "a", encoding="utf-8") as logf:
-            logf.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {msg}\n")
+    # per-file lines go to the log file (buffered); summaries are printed too
+    with OpLogger(log_file, log_format) as logger:
+        return _folderize(base_dir, folder_name_override, workers, journal_path, logger)
+
+
+def _folderize(base_dir, folder_name_override, workers, journal_path, logger):
+    log, summary = logger.log, logger.summary
 
     # --- Helpers ---
     def parse_folder_key(filename: str):
@@ -95,12 +105,13 @@ def folderize(target_folder,
 
         return None
 
-    log("----- Sorting Started -----")
+    summary("----- Sorting Started -----")
 
     # --- Initialize Counters/Map ---
     total_files = 0
     total_grouped = 0
     total_skipped = 0
+    total_unrecognized = 0
     folder_file_map = {}
 
     # --- Collect Files ---
@@ -114,53 +125,47 @@ def folderize(target_folder,
             folder_file_map.setdefault(folder_key, []).append(filename)
             total_files += 1
         else:
-            log(f"⚠️ Skipping unrecognized file: {filename}")
-
-    # --- Process Folder Groups ---
-    for folder_name, files in folder_file_map.items():
-        if len(files) == 3:
-            folder_path = os.path.join(base_dir, folder_name)
-            if not os.path.exists(folder_path):
-                log(f"📁 Creating folder: {folder_name}")
-                os.makedirs(folder_path)
-            for f in files:
-                src = os.path.join(base_dir, f)
-                dst = os.path.join(folder_path, f)
-                log(f"📦 Moving {f} -> {folder_name}")
-                shutil.move(src, dst)
-            total_grouped += 1
-        else:
-            log(f"❌ Skipping {folder_name}: only found {len(files)}/3 files.")
-            total_skipped += 1
-
-    # --- Final Stats ---
-    log("----- Sorting Complete -----")
-    log(f"📊 Total IMG_ files found: {total_files}")
-    log(f"📦 Folders grouped (3 files each): {total_grouped}")
-    log(f"❌ Skipped groups (not exactly 3 files): {total_skipped}")
-    print("✅ Grouping Done!")
+            log(f"⚠️ Skipping unrecognized file: {filename}", file=filename)
+            total_unrecognized += 1
 
-    # --- Move PID folders into a date folder (Eastern Time, yyyymmdd) ---
+    # --- Date folder (Eastern Time, yyyymmdd) ---
     eastern_time = datetime.now(ZoneInfo("America/New_York"))
     today_str = eastern_time.strftime("%Y%m%d")
 
     if folder_name_override:
         today_str = folder_name_override
-        log(f"Date folder manually set to {today_str}")
+        summary(f"Date folder manually set to {today_str}")
 
     date_folder_path = os.path.join(base_dir, today_str)
-    os.makedirs(date_folder_path, exist_ok=True)
 
-    log(f"📂 Moving PID folders into date folder: {today_str}")
-    moved_count = 0
+    # --- Plan: each complete PID group goes straight into <date>/<PID>/ ---
+    plan = OpPlan()
+    plan.mkdir(date_folder_path)
     for folder_name, files in folder_file_map.items():
-        folder_path = os.path.join(base_dir, folder_name)
-        if os.path.isdir(folder_path) and len(files) == 3:
-            dst = os.path.join(date_folder_path, folder_name)
-            shutil.move(folder_path, dst)
-            moved_count += 1
+        if len(files) == 3:
+            folder_path = os.path.join(date_folder_path, folder_name)
+            if not plan.is_dir(folder_path):
+                log(f"📁 Creating folder: {today_str}/{folder_name}")
+            for f in files:
+                log(f"📦 Moving {f} -> {folder_name}", file=f, folder=folder_name)
+                plan.move(os.path.join(base_dir, f), os.path.join(folder_path, f))
+            total_grouped += 1
+        else:
+            log(f"❌ Skipping {folder_name}: only found {len(files)}/3 files.", folder=folder_name, found=len(files))
+            total_skipped += 1
+
+    result = execute_plan(plan, journal_path, workers, label="folderize")
+    for op, error in result.failed:
+        log(f"❌ Failed {op.kind} {op.src or ''} -> {op.dst}: {error}", src=op.src, dst=op.dst, error=error)
 
-    log(f"✅ Moved {moved_count} PID folders to {today_str}")
+    # --- Final Stats ---
+    summary("----- Sorting Complete -----")
+    summary(f"📊 Total IMG_ files found: {total_files}")
+    summary(f"📦 Folders grouped (3 files each): {total_grouped}")
+    summary(f"❌ Skipped groups (not exactly 3 files): {total_skipped}")
+    summary(f"⚠️ Unrecognized files left in place: {total_unrecognized}")
+    summary(f"✅ Moved {total_grouped} PID folders to {today_str}")
+    summary(f"🧾 Undo with: python -m functions.file_ops undo \"{result.journal_path}\"")
     print("✅ Done!")
 
 
@@ -171,7 +176,8 @@ def filenamerize(
     sort_by,
     prefix="IMG_",
     files_per_asset=3,
-    dry_run=False
+    dry_run=False,
+    journal_path=None
 ):
     TARGET_DIR = target_dir
     LANGUAGE_CODE = language_code
@@ -185,22 +191,11 @@ def filenamerize(
         return [int(t) if t.isdigit() else t.lower()
                 for t in re.findall(r'\d+|\D+', s)]
 
-    def exif_datetime_key(path: str):
-        # EXIF DateTimeOriginal; fallback to mtime
-        try:
-            from PIL import Image, ExifTags
-            with Image.open(path) as im:
-                exif = im.getexif() or {}
-                tag_id = next((k for k, v in ExifTags.TAGS.items() if v == "DateTimeOriginal"), None)
-                if tag_id and tag_id in exif:
-                    s = str(exif[tag_id])  # "YYYY:MM:DD HH:MM:SS"
-                    date, time = s.split()
-                    y, m, d = map(int, date.split(":"))
-                    hh, mm, ss = map(int, time.split(":"))
-                    return (y, m, d, hh, mm, ss)
-        except Exception:
-            pass
-        return (os.path.getmtime(path),)
+    def exif_datetime_keys(folder: str, files: List[str]):
+        # EXIF DateTimeOriginal read from the headers on a thread pool; fallback to mtime
+        paths = [os.path.join(folder, f) for f in files]
+        taken = exif_datetimes(paths)
+        return {f: taken[p] or (os.path.getmtime(p),) for f, p in zip(files, paths)}
 
     def sort_files(files: List[str], folder: str, how: str) -> List[str]:
         if how == "date":
@@ -210,7 +205,8 @@ def filenamerize(
         elif how == "name_natural":
             files.sort(key=natural_key)
         elif how == "date_exif":
-            files.sort(key=lambda f: exif_datetime_key(os.path.join(folder, f)))
+            keys = exif_datetime_keys(folder, files)
+            files.sort(key=keys.__getitem__)
         else:
             raise ValueError("Invalid SORT_BY. Use 'date', 'name', 'name_natural', or 'date_exif'.")
         return files
@@ -267,11 +263,10 @@ def filenamerize(
         print("🧪 Dry-run enabled: no files will be renamed.")
         return
 
-    # --- rename with safeguards ---
-    success = 0
+    # --- plan all renames at once (chains ordered, cycles via temp names), then run them ---
+    plan = OpPlan()
     skipped_same = 0
-    skipped_collision = 0
-    failed = 0
+    renames = []
 
     for idx, filename in enumerate(files):
         old_path = os.path.join(TARGET_DIR, filename)
@@ -283,21 +278,21 @@ def filenamerize(
             print(f"⏭️  Already named correctly, skipping: {filename}")
             skipped_same += 1
             continue
-
-        # collision check
-        if os.path.exists(new_path):
-            print(f"⚠️  Destination exists, skipping: {filename} → {new_name}")
-            skipped_collision += 1
-            continue
-
-        try:
-            os.rename(old_path, new_path)  # original behavior :contentReference[oaicite:2]{index=2}
-            print(f"🔁 {filename} → {new_name}")
-            success += 1
-        except Exception as e:
-            print(f"❌ Failed on {filename}: {e}")
-            failed += 1
-            continue
+        renames.append((old_path, new_path))
+
+    # a destination only collides if its current file isn't being renamed too
+    final = plan.rename_many(renames, on_conflict=CONFLICT_SKIP)
+    for old_path, new_path in plan.skipped:
+        print(f"⚠️  Destination exists, skipping: {os.path.basename(old_path)} → {os.path.basename(new_path)}")
+    if plan.parked:
+        print(f"🔄 {plan.parked} rename cycle(s) resolved through temporary names")
+
+    result = execute_plan(plan, journal_path, label="filenamerize")
+    # only moves that put a file under its new name count; parking moves don't
+    targets = {os.path.normcase(dst) for dst in final.values() if dst is not None}
+    success = sum(1 for op in result.completed if op.kind == MOVE and os.path.normcase(op.dst) in targets)
+    skipped_collision = len(plan.skipped)
+    failed = len(result.failed)
 
     print("\n✅ Done.")
     print(f"   Renamed   : {success}")
@@ -306,49 +301,35 @@ def filenamerize(
     print(f"   Failed    : {failed}")
 
 
-def extract_files_from_pid(base_dir, folder_prefix): 
-    
-    target_folder = os.path.join(base_dir, "COLLECTED_FILES")    
+def extract_files_from_pid(base_dir, folder_prefix, workers=4, journal_path=None):
 
-    # --- Setup target folder ---
-    os.makedirs(target_folder, exist_ok=True)
+    target_folder = os.path.join(base_dir, "COLLECTED_FILES")
 
-    # --- Move files ---
-    moved_files = 0
+    # --- Plan moves (name conflicts get a _1, _2, ... suffix) ---
+    plan = OpPlan()
+    plan.mkdir(target_folder)
     for entry in os.listdir(base_dir):
         pid_path = os.path.join(base_dir, entry)
-        
-        # Check for PID folders starting with 
+
+        # Check for PID folders starting with
         if os.path.isdir(pid_path) and entry.startswith(folder_prefix):
             for root, _, files in os.walk(pid_path):
                 for file in files:
-                    src_file = os.path.join(root, file)
-                    dest_file = os.path.join(target_folder, file)
-
-                    # Handle filename conflicts
-                    name, ext = os.path.splitext(file)
-                    counter = 1
-                    while os.path.exists(dest_file):
-                        dest_file = os.path.join(target_folder, f"{name}_{counter}{ext}")
-                        counter += 1
+                    plan.move(os.path.join(root, file), os.path.join(target_folder, file))
 
-                    shutil.move(src_file, dest_file)
-                    moved_files += 1
+    # --- Move files ---
+    result = execute_plan(plan, journal_path, workers, label="extract_files_from_pid")
+    moved_files = sum(1 for op in plan.ops if op.kind == MOVE) - len(result.failed)
 
     print(f"✅ Moved {moved_files} file(s) into: {target_folder}")
 
 
 import os
-import hashlib
 import shutil
 
-def file_md5(filepath, chunk_size=8192):
-    """Compute MD5 hash of a file."""
-    md5 = hashlib.md5()
-    with open(filepath, "rb") as f:
-        for chunk in iter(lambda: f.read(chunk_size), b""):
-            md5.update(chunk)
-    return md5.hexdigest()
+from functions.hashing import file_md5
+from functions.hash_cache import cached_file_md5
+from functions.registry_query import RegistryQuery
 
 
 def revert_original_filenames_v1(raw_dir, renamed_dir, log_csv="restore_log.csv"):
@@ -401,60 +382,95 @@ def revert_original_filenames_v1(raw_dir, renamed_dir, log_csv="restore_log.csv"
                     print(f"⚠️ No match found for {fname} (hash={file_hash})")
                     writer.writerow([file_hash, fname, "NO_MATCH"])
 
-def revert_original_filenames(raw_dir, renamed_dir, log_csv="restore_log.csv"):
+def revert_original_filenames(raw_dir, renamed_dir, log_csv="restore_log.csv",
+                              registry_path=None, registry_mode="raw", journal_path=None):
     """
     Restore original filenames in renamed_dir using MD5 hashes
     from files in raw_dir, and log the changes to a CSV file.
-    
+    Only the renamed files are hashed up front. Their original names come from
+    the md5 registry when one is given; whatever it doesn't know is matched
+    by hashing just the raw files whose size equals a still-unmatched renamed file.
+
     Args:
-        raw_dir (str): Directory containing original files.
+        raw_dir (str): Directory containing original files (None = registry only).
         renamed_dir (str): Directory containing renamed files to be restored.
         log_csv (str): Path to the CSV log file (default: restore_log.csv).
+        registry_path (str): md5_manager registry database to look names up in.
+        registry_mode (str): registry mode holding the original files (default: raw).
+        journal_path (str): undo journal (default: file_ops_journal/<timestamp>.jsonl).
     """
-    # 1) Build a map of md5 -> original filename
-    md5_to_name = {}
-    raw_files = []
-    for root, _, files in os.walk(raw_dir):
-        for fname in files:
-            raw_files.append(os.path.join(root, fname))
-
-    for path in tqdm(raw_files, desc="Hashing raw files"):
-        file_hash = file_md5(path)
-        md5_to_name[file_hash] = os.path.basename(path)
-
-    # Collect renamed_dir files
+    # Collect renamed_dir files and their hashes
     renamed_files = []
     for root, _, files in os.walk(renamed_dir):
         for fname in files:
             renamed_files.append(os.path.join(root, fname))
 
-    # Open CSV for logging
+    renamed_md5 = {}
+    wanted = {}  # md5 -> size, for hashes without an original name yet
+    for path in tqdm(renamed_files, desc="Hashing renamed files"):
+        renamed_md5[path] = cached_file_md5(path)
+        wanted[renamed_md5[path]] = os.path.getsize(path)
+
+    # 1) Build a map of md5 -> original filename
+    md5_to_name = {}
+    if registry_path is not None and os.path.exists(registry_path):
+        with RegistryQuery(registry_path) as query:
+            for file_hash in list(wanted):
+                record = next(query.paths_for_md5(file_hash, registry_mode), None)
+                if record is not None:
+                    md5_to_name[file_hash] = record.path.rsplit("/", 1)[-1]
+                    del wanted[file_hash]
+        print(f"📇 {len(md5_to_name)} of {len(renamed_md5)} file(s) matched in the registry")
+
+    if wanted and raw_dir is not None:
+        # a raw file can only match if it has the same size as an unmatched renamed file
+        sizes = set(wanted.values())
+
+        def size_matched():
+            # walked lazily, so the walk ends once every renamed file is matched
+            for root, _, files in os.walk(raw_dir):
+                for fname in files:
+                    path = os.path.join(root, fname)
+                    try:
+                        if os.path.getsize(path) in sizes:
+                            yield path
+                    except OSError as e:
+                        print(f"⚠️ Error reading {path}: {e}")
+
+        for path in tqdm(size_matched(), desc="Hashing size-matched raw files", unit="file"):
+            try:
+                file_hash = cached_file_md5(path)
+            except OSError as e:
+                print(f"⚠️ Error reading {path}: {e}")
+                continue
+            if file_hash in wanted:
+                md5_to_name[file_hash] = os.path.basename(path)
+                del wanted[file_hash]
+                sizes = set(wanted.values())
+                if not wanted:
+                    break
+
+    # 2) Plan a rename for each matched file (name conflicts get a _1, _2, ... suffix)
+    plan = OpPlan()
+    rows = []
+    for path in renamed_files:
+        fname = os.path.basename(path)
+        file_hash = renamed_md5[path]
+
+        if file_hash in md5_to_name:
+            new_path = plan.rename(path, md5_to_name[file_hash])
+            if new_path != path:  # Avoid unnecessary rename
+                rows.append((path, [file_hash, fname, os.path.basename(new_path)]))
+        else:
+            print(f"⚠️ No match found for {fname} (hash={file_hash})")
+            rows.append((path, [file_hash, fname, "NO_MATCH"]))
+
+    result = execute_plan(plan, journal_path, label="revert_original_filenames")
+    failed = {op.src for op, _ in result.failed}
+
+    # Log the changes to CSV
     with open(log_csv, mode="w", newline="", encoding="utf-8") as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow(["md5", "old_filename", "new_filename"])
-
-        # 2) For each file in renamed_dir, match and rename
-        for path in tqdm(renamed_files, desc="Restoring filenames"):
-            fname = os.path.basename(path)
-            file_hash = file_md5(path)
-
-            if file_hash in md5_to_name:
-                original_name = md5_to_name[file_hash]
-                new_path = os.path.join(os.path.dirname(path), original_name)
-
-                if path != new_path:  # Avoid unnecessary rename
-                    # Handle filename collisions by appending suffix
-                    counter = 1
-                    base, ext = os.path.splitext(original_name)
-                    while os.path.exists(new_path):
-                        new_path = os.path.join(os.path.dirname(path), f"{base}_{counter}{ext}")
-                        counter += 1
-
-                    print(f"Renaming: {fname} -> {os.path.basename(new_path)}")
-                    shutil.move(path, new_path)
-
-                    # Log the change
-                    writer.writerow([file_hash, fname, os.path.basename(new_path)])
-            else:
-                print(f"⚠️ No match found for {fname} (hash={file_hash})")
-                writer.writerow([file_hash, fname, "NO_MATCH"])
\ No newline at end of file
+        for path, row in rows:
+            writer.writerow(row[:2] + ["FAILED"] if path in failed else row)
@@ -1,15 +1,8 @@
 import os
-import hashlib
 import pandas as pd
 from tqdm import tqdm
 
-def file_md5(filepath, chunk_size=8192):
-    """Compute MD5 hash for a file."""
-    md5 = hashlib.md5()
-    with open(filepath, "rb") as f:
-        for chunk in iter(lambda: f.read(chunk_size), b""):
-            md5.update(chunk)
-    return md5.hexdigest()
+from functions.hash_cache import cached_file_md5 as file_md5
 
 def get_hashes_from_dir(root_dir, desc="Hashing files"):
     """Return a dict of {hash: [filepaths]} for all files under root_dir."""
@@ -0,0 +1,173 @@
+import os
+import csv
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from functions.hash_cache import cached_file_md5, get_hash_cache
+from functions.io_governor import IOGovernor, current_governor
+from functions.scan_stats import ScanStats
+
+EDGE_BYTES = 8192  # bytes read from each end of a file for the partial hash
+
+# ==============================
+# Hash Stages
+# ==============================
+
+def partial_md5(file_path: str, size: int, edge_bytes: int = EDGE_BYTES,
+                governor: Optional[IOGovernor] = None) -> str:
+    """
+    MD5 of the first and last edge_bytes of a file (the whole file if it's smaller).
+    governor: I/O rate limiter charged for every read; defaults to the
+    process-wide one, as in functions.hashing.file_digests.
+    """
+    if governor is None:
+        governor = current_governor()
+    hasher = hashlib.md5()
+    with open(file_path, "rb") as f:
+        if size <= 2 * edge_bytes:
+            if governor is not None:
+                governor.throttle(size)
+            hasher.update(f.read())
+        else:
+            if governor is not None:
+                governor.throttle(edge_bytes)
+            hasher.update(f.read(edge_bytes))
+            f.seek(-edge_bytes, os.SEEK_END)
+            if governor is not None:
+                governor.throttle(edge_bytes)
+            hasher.update(f.read(edge_bytes))
+    return hasher.hexdigest()
+
+
+def _collisions(groups: Dict[object, List[str]]) -> List[List[str]]:
+    return [paths for paths in groups.values() if len(paths) > 1]
+
+
+def _hash_all(func: Callable[[str], str], paths: List[str], max_workers: int, desc: str,
+              stats: ScanStats, phase: str, read_size: Callable[[str], int]):
+    """Yield (path, digest) for every path, digest None on error."""
+    def safe(path):
+        try:
+            with stats.phase(phase):
+                digest = func(path)
+            stats.hashed(read_size(path))
+            return path, digest
+        except Exception as e:
+            tqdm.write(f"⚠️ Error hashing {path}: {e}")
+            return path, None
+
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            bar = tqdm(executor.map(safe, paths), total=len(paths), desc=desc, unit="file")
+            stats.attach(bar)
+            yield from bar
+    else:
+        bar = tqdm(map(safe, paths), total=len(paths), desc=desc, unit="file")
+        stats.attach(bar)
+        yield from bar
+
+
+# ==============================
+# Duplicate Detection
+# ==============================
+
+def find_duplicate_groups(
+    file_paths: Iterable[str],
+    max_workers: int = 1,
+    edge_bytes: int = EDGE_BYTES,
+    stats: Optional[ScanStats] = None,
+    metrics_path: Optional[str] = None,
+) -> Tuple[Dict[str, Optional[str]], Dict[str, List[str]]]:
+    """
+    Find identical files without reading more bytes than needed:
+        1. group by size — a file with a unique size has no duplicate
+        2. hash the first/last edge_bytes of each size collision
+        3. fully MD5 only the files that still collide
+    Returns (file -> md5, or None if it was never fully hashed,
+             md5 -> paths for every hash shared by 2+ files).
+    stats: ScanStats filled with per-stage timings and bytes read (full-hash
+    bytes include files served by the hash cache, also counted in cache_hits);
+    metrics_path appends them as a JSON line.
+    """
+    stats = stats if stats is not None else ScanStats("find_duplicates")
+    file_hashes: Dict[str, Optional[str]] = {}
+    sizes: Dict[str, int] = {}
+    by_size: Dict[int, List[str]] = {}
+    with stats.phase("size"):
+        for path in file_paths:
+            file_hashes[path] = None
+            try:
+                size = os.path.getsize(path)
+            except OSError as e:
+                tqdm.write(f"⚠️ Error reading {path}: {e}")
+                continue
+            sizes[path] = size
+            by_size.setdefault(size, []).append(path)
+    stats.count("", "files_seen", len(file_hashes))
+
+    # Stage 2: partial hash of same-size files. Files no bigger than the two
+    # edges are read whole, so their partial hash is already the full md5.
+    candidates = [p for group in _collisions(by_size) for p in group]
+    by_partial: Dict[Tuple[int, str], List[str]] = {}
+    for path, digest in _hash_all(
+        lambda p: partial_md5(p, sizes[p], edge_bytes), candidates, max_workers, "Partial hashing",
+        stats, "partial_hash", lambda p: min(sizes[p], 2 * edge_bytes),
+    ):
+        if digest is None:
+            continue
+        if sizes[path] <= 2 * edge_bytes:
+            file_hashes[path] = digest
+        by_partial.setdefault((sizes[path], digest), []).append(path)
+
+    # Stage 3: full hash of remaining collisions
+    to_hash = [p for group in _collisions(by_partial) for p in group if file_hashes[p] is None]
+    cache_hits = get_hash_cache().hits
+    for path, digest in _hash_all(cached_file_md5, to_hash, max_workers, "Full hashing",
+                                  stats, "full_hash", sizes.__getitem__):
+        file_hashes[path] = digest
+    stats.cache_hits += get_hash_cache().hits - cache_hits
+
+    by_md5: Dict[str, List[str]] = {}
+    for group in _collisions(by_partial):
+        for path in group:
+            if file_hashes[path] is not None:
+                by_md5.setdefault(file_hashes[path], []).append(path)
+    duplicates = {h: paths for h, paths in by_md5.items() if len(paths) > 1}
+
+    skipped = len(file_hashes) - len(candidates)
+    tqdm.write(f"Found {len(file_hashes)} files: {skipped} with a unique size, "
+               f"{len(to_hash)} fully hashed, {len(duplicates)} duplicate groups.")
+    stats.finish()
+    if metrics_path:
+        stats.write_jsonl(metrics_path)
+    return file_hashes, duplicates
+
+
+# ==============================
+# Reports
+# ==============================
+
+def write_reports(folder_path: str, file_hashes: Dict[str, Optional[str]], duplicates: Dict[str, List[str]]):
+    """
+    Write all_files.csv (every file; the hash is blank when the file could not
+    have a duplicate and was never fully read) and duplicates.csv into folder_path.
+    Returns both report paths.
+    """
+    all_files_csv = os.path.join(folder_path, 'all_files.csv')
+    with open(all_files_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['File Path', 'MD5 Hash'])
+        for path, h in file_hashes.items():
+            writer.writerow([path, h or ''])
+
+    duplicates_csv = os.path.join(folder_path, 'duplicates.csv')
+    with open(duplicates_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['MD5 Hash', 'Duplicate File Paths'])
+        for h, paths in duplicates.items():
+            writer.writerow([h, '; '.join(paths)])
+
+    return all_files_csv, duplicates_csv
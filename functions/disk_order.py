@@ -0,0 +1,88 @@
+import os
+import struct
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+T = TypeVar("T")
+
+READ_ORDERS = ("inode", "extent")
+
+# ==============================
+# Physical Layout
+# ==============================
+
+FS_IOC_FIEMAP = 0xC020660B
+_FIEMAP_HEADER = struct.Struct("QQIIII")       # start, length, flags, mapped, count, reserved
+_FIEMAP_EXTENT = struct.Struct("QQQQQIIII")    # logical, physical, length, 2x reserved, flags, 3x reserved
+
+
+def physical_offset(path: str) -> Optional[int]:
+    """
+    Byte offset on the device of the first extent of path (Linux FIEMAP),
+    or None where the filesystem or platform doesn't report extents.
+    """
+    if fcntl is None:
+        return None
+    buf = bytearray(_FIEMAP_HEADER.size + _FIEMAP_EXTENT.size)
+    _FIEMAP_HEADER.pack_into(buf, 0, 0, 0xFFFFFFFFFFFFFFFF, 0, 0, 1, 0)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        fcntl.ioctl(fd, FS_IOC_FIEMAP, buf)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    mapped = _FIEMAP_HEADER.unpack_from(buf)[3]
+    if not mapped:
+        return None  # empty or inline file
+    return _FIEMAP_EXTENT.unpack_from(buf, _FIEMAP_HEADER.size)[1]
+
+
+# ==============================
+# Read Ordering
+# ==============================
+
+def read_order_key(path: str, inode: int, read_order: str) -> Tuple[int, int]:
+    """
+    Sort key placing files in on-disk order. "extent" uses the physical offset
+    of the first extent, falling back to the inode number (which most
+    filesystems allocate near the data) when FIEMAP is unavailable.
+    """
+    if read_order == "extent":
+        offset = physical_offset(path)
+        if offset is not None:
+            return 0, offset
+    return 1, inode
+
+
+_warned_unordered = False
+
+
+def sort_for_reading(items: Sequence[T], path_of: Callable[[T], str], inode_of: Callable[[T], int],
+                     read_order: Optional[str]) -> List[T]:
+    """
+    items sorted by read_order ("inode" / "extent"); None keeps their order.
+    If no item has an extent or inode number to sort by, they are kept in order
+    and a warning is printed once.
+    """
+    if read_order is None:
+        return list(items)
+    if read_order not in READ_ORDERS:
+        raise ValueError(f"read_order must be one of {READ_ORDERS} or None, got {read_order!r}")
+    keyed = [(read_order_key(path_of(item), inode_of(item), read_order), i) for i, item in enumerate(items)]
+    if keyed and all(key == (1, 0) for key, _ in keyed):
+        # no extents and no inode numbers to go by (e.g. paths that couldn't be stat'd)
+        global _warned_unordered
+        if not _warned_unordered:
+            _warned_unordered = True
+            print(f"⚠️ On-disk order ({read_order}) unavailable here: no inode numbers; reading in walk order")
+        return list(items)
+    keyed.sort()
+    return [items[i] for _, i in keyed]
@@ -0,0 +1,156 @@
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
+
+ExifDateTime = Tuple[int, int, int, int, int, int]  # (y, m, d, hh, mm, ss)
+
+TAG_DATETIME = 0x0132            # IFD0: last modified
+TAG_EXIF_IFD = 0x8769            # IFD0: pointer to the Exif IFD
+TAG_DATETIME_ORIGINAL = 0x9003   # Exif IFD: when the picture was taken
+TAG_DATETIME_DIGITIZED = 0x9004
+
+HEAD_BYTES = 256 * 1024          # how far into a HEIC/other container to look for an Exif block
+MAX_IFD_ENTRIES = 1024           # guards against corrupt offsets
+
+# ==============================
+# TIFF / Exif Parsing
+# ==============================
+
+def _parse_datetime(raw: bytes) -> Optional[ExifDateTime]:
+    """b"YYYY:MM:DD HH:MM:SS" -> (y, m, d, hh, mm, ss), None if blank or malformed."""
+    try:
+        date, time = raw.split(b"\x00", 1)[0].decode("ascii").strip().split()
+        y, m, d = map(int, date.split(":"))
+        hh, mm, ss = map(int, time.split(":"))
+    except ValueError:
+        return None
+    return None if y == 0 else (y, m, d, hh, mm, ss)
+
+
+def _read_at(f: BinaryIO, offset: int, size: int) -> bytes:
+    f.seek(offset)
+    return f.read(size)
+
+
+def _read_ifd(f: BinaryIO, base: int, offset: int, order: str, wanted: Tuple[int, ...]) -> Dict[int, bytes]:
+    """
+    Raw values of the wanted tags in the IFD at base + offset (only ASCII and
+    LONG values are needed here). Reads just the entry table and the values.
+    """
+    head = _read_at(f, base + offset, 2)
+    if len(head) < 2:
+        return {}
+    count = struct.unpack(order + "H", head)[0]
+    if count > MAX_IFD_ENTRIES:
+        return {}
+    table = f.read(12 * count)
+    found: Dict[int, bytes] = {}
+    for i in range(len(table) // 12):
+        tag, typ, n, value = struct.unpack_from(order + "HHI4s", table, i * 12)
+        if tag not in wanted:
+            continue
+        if typ == 2:      # ASCII: inline if it fits in 4 bytes, otherwise an offset
+            if n <= 4:
+                found[tag] = value[:n]
+            else:
+                found[tag] = _read_at(f, base + struct.unpack(order + "I", value)[0], min(n, 64))
+        elif typ in (4, 13):  # LONG / IFD pointer
+            found[tag] = value
+    return found
+
+
+def _tiff_datetime(f: BinaryIO, base: int) -> Optional[ExifDateTime]:
+    """DateTimeOriginal (else DateTimeDigitized, else DateTime) of the TIFF structure at base."""
+    header = _read_at(f, base, 8)
+    if header[:4] == b"II*\x00":
+        order = "<"
+    elif header[:4] == b"MM\x00*":
+        order = ">"
+    else:
+        return None
+    ifd0 = struct.unpack(order + "I", header[4:8])[0]
+    tags = _read_ifd(f, base, ifd0, order, (TAG_DATETIME, TAG_EXIF_IFD))
+    if TAG_EXIF_IFD in tags:
+        exif_ifd = struct.unpack(order + "I", tags[TAG_EXIF_IFD])[0]
+        exif = _read_ifd(f, base, exif_ifd, order, (TAG_DATETIME_ORIGINAL, TAG_DATETIME_DIGITIZED))
+        for tag in (TAG_DATETIME_ORIGINAL, TAG_DATETIME_DIGITIZED):
+            if tag in exif:
+                value = _parse_datetime(exif[tag])
+                if value is not None:
+                    return value
+    if TAG_DATETIME in tags:
+        return _parse_datetime(tags[TAG_DATETIME])
+    return None
+
+
+def _jpeg_exif_base(f: BinaryIO) -> Optional[int]:
+    """Offset of the TIFF header inside a JPEG's APP1 Exif segment, walking segment headers only."""
+    pos = 2
+    while True:
+        marker = _read_at(f, pos, 4)
+        if len(marker) < 4 or marker[0] != 0xFF:
+            return None
+        kind, length = marker[1], struct.unpack(">H", marker[2:4])[0]
+        if kind == 0xE1 and _read_at(f, pos + 4, 6) == b"Exif\x00\x00":
+            return pos + 10
+        if kind in (0xDA, 0xD9):  # start of scan / end of image: no Exif ahead
+            return None
+        pos += 2 + length
+
+
+def read_exif_datetime(path: str) -> Optional[ExifDateTime]:
+    """
+    When a photo was taken, read from its Exif header without decoding the image:
+    JPEG (APP1 segment), TIFF-based files (TIFF, DNG and most camera raws) and,
+    for HEIC and other containers, an Exif block within the first HEAD_BYTES.
+    Only the headers and the few bytes of each value are read. None if not found.
+    """
+    try:
+        with open(path, "rb") as f:
+            magic = f.read(4)
+            if magic[:2] == b"\xff\xd8":
+                base = _jpeg_exif_base(f)
+            elif magic in (b"II*\x00", b"MM\x00*"):
+                base = 0
+            else:
+                head = _read_at(f, 0, HEAD_BYTES)
+                at = head.find(b"Exif\x00\x00")
+                base = at + 6 if at >= 0 else None
+            return _tiff_datetime(f, base) if base is not None else None
+    except (OSError, struct.error):
+        return None
+
+
+# ==============================
+# Cached / Parallel Lookup
+# ==============================
+
+_cache: Dict[Tuple[str, int, int], Optional[ExifDateTime]] = {}
+_cache_lock = threading.Lock()
+
+
+def exif_datetime(path: str) -> Optional[ExifDateTime]:
+    """read_exif_datetime, cached for the process by (path, size, mtime_ns)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _cache_lock:
+        if key in _cache:
+            return _cache[key]
+    value = read_exif_datetime(path)
+    with _cache_lock:
+        _cache[key] = value
+    return value
+
+
+def exif_datetimes(paths: Iterable[str], workers: int = 8) -> Dict[str, Optional[ExifDateTime]]:
+    """path -> exif_datetime(path) for a batch, read on a pool of `workers` threads."""
+    paths = list(paths)
+    if workers <= 1 or len(paths) < 2:
+        return {p: exif_datetime(p) for p in paths}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="exif") as pool:
+        return dict(zip(paths, pool.map(exif_datetime, paths)))
@@ -1,36 +1,57 @@
 import os
-import hashlib
 import pandas as pd
 from tqdm import tqdm
 from pathlib import Path
 
-def file_md5(filepath, chunk_size=8192):
-    """Compute MD5 hash for a file."""
-    md5 = hashlib.md5()
-    with open(filepath, "rb") as f:
-        for chunk in iter(lambda: f.read(chunk_size), b""):
-            md5.update(chunk)
-    return md5.hexdigest()
+from functions.disk_order import sort_for_reading
+from functions.hash_cache import get_hash_cache
+from functions.scan_stats import ScanStats
 
-def hash_directory(root_dir, csv_out=None):
+def hash_directory(root_dir, csv_out=None, read_order=None, stats=None, metrics_path=None):
+    """
+    MD5 every file under root_dir. read_order "inode" or "extent" reads the
+    files in on-disk order (faster on spinning disks); rows keep walk order.
+    stats: ScanStats filled with walk/hash timings and bytes read;
+    metrics_path appends them as a JSON line.
+    """
+    stats = stats if stats is not None else ScanStats(f"hash_directory {Path(root_dir).name}")
+    cache = get_hash_cache()
     all_files = []
-    for base, _, files in os.walk(root_dir):
-        for fname in files:
-            all_files.append(os.path.join(base, fname))
+    with stats.phase("walk"):
+        for base, _, files in os.walk(root_dir):
+            for fname in files:
+                all_files.append(os.path.join(base, fname))
+    stats.count("", "files_seen", len(all_files))
 
-    results = []
-    #for fpath in tqdm(all_files, desc=f"Hashing {root_dir}"):
-    for fpath in tqdm(all_files, desc=f"Hashing {Path(root_dir).name}"):
+    def inode(path):
+        try:
+            return os.stat(path).st_ino
+        except OSError:
+            return 0
+
+    hashes = {}
+    bar = tqdm(sort_for_reading(all_files, str, inode, read_order), desc=f"Hashing {Path(root_dir).name}")
+    stats.attach(bar)
+    for fpath in bar:
         try:
-            h = file_md5(fpath)
-            results.append({"filepath": fpath, "md5": h})
+            hits = cache.hits
+            with stats.phase("hash"):
+                hashes[fpath] = cache.file_md5(fpath)
+            if cache.hits > hits:
+                stats.cache_hit()
+            else:
+                stats.hashed(os.path.getsize(fpath))
         except Exception as e:
             print(f"⚠️ Failed hashing {fpath}: {e}")
-            results.append({"filepath": fpath, "md5": None})
+            hashes[fpath] = None
 
+    results = [{"filepath": fpath, "md5": hashes[fpath]} for fpath in all_files]
     df = pd.DataFrame(results)
     if csv_out:
         df.to_csv(csv_out, index=False)
+    stats.finish()
+    if metrics_path:
+        stats.write_jsonl(metrics_path)
     return df
 
 
@@ -0,0 +1,501 @@
+import errno
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from tqdm import tqdm
+
+MOVE = "move"
+MKDIR = "mkdir"
+RMDIR = "rmdir"  # only used to undo a mkdir
+
+# what OpPlan.move does when the destination name is taken
+CONFLICT_SUFFIX = "suffix"  # use the first free "<name>_<n><ext>"
+CONFLICT_SKIP = "skip"      # leave the file where it is (recorded in plan.skipped)
+CONFLICT_ERROR = "error"    # raise FileExistsError
+
+JOURNAL_DIR = "file_ops_journal"
+
+# ==============================
+# Operation Plan
+# ==============================
+
+class FileOp(NamedTuple):
+    kind: str            # MOVE / MKDIR / RMDIR
+    src: Optional[str]   # None for MKDIR / RMDIR
+    dst: str
+
+
+def _key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+class OpPlan:
+    """
+    An ordered list of file operations, validated before anything touches the disk.
+    Every directory involved is listed once; planned moves then update that
+    in-memory name set, so collisions with existing files and with earlier
+    operations of the same plan are caught (and suffixed or skipped) up front,
+    without probing os.path.exists per candidate name.
+    Missing destination directories are added as mkdir operations.
+    """
+
+    def __init__(self):
+        self.ops: List[FileOp] = []
+        self.skipped: List[Tuple[str, str]] = []   # (src, dst) left alone because dst was taken
+        self._names: Dict[str, Set[str]] = {}      # dir key -> normcased names once the plan so far has run
+        self._new_dirs: Set[str] = set()
+        self.parked = 0                            # rename cycles broken with a temporary name
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def _names_in(self, folder: str) -> Set[str]:
+        key = _key(folder)
+        names = self._names.get(key)
+        if names is None:
+            try:
+                names = {os.path.normcase(n) for n in os.listdir(folder)}
+            except FileNotFoundError:
+                names = set()
+            self._names[key] = names
+        return names
+
+    def is_taken(self, path: str) -> bool:
+        """True if path exists, or will once the plan so far has run."""
+        folder, name = os.path.split(os.path.abspath(path))
+        return os.path.normcase(name) in self._names_in(folder)
+
+    def is_dir(self, path: str) -> bool:
+        return _key(path) in self._new_dirs or os.path.isdir(path)
+
+    def free_name(self, path: str) -> str:
+        """path itself if free, otherwise the first free "<name>_<n><ext>" next to it."""
+        folder, name = os.path.split(path)
+        base, ext = os.path.splitext(name)
+        names = self._names_in(folder)
+        counter = 1
+        while os.path.normcase(name) in names:
+            name = f"{base}_{counter}{ext}"
+            counter += 1
+        return os.path.join(folder, name)
+
+    def mkdir(self, path: str) -> str:
+        """Plan creating directory path (and any missing parents)."""
+        if self.is_dir(path):
+            return path
+        if self.is_taken(path):
+            raise FileExistsError(f"cannot create directory, a file is in the way: {path}")
+        parent = os.path.dirname(os.path.abspath(path))
+        if not self.is_dir(parent):
+            self.mkdir(parent)
+        self._names_in(parent).add(os.path.normcase(os.path.basename(os.path.abspath(path))))
+        self._names[_key(path)] = set()
+        self._new_dirs.add(_key(path))
+        self.ops.append(FileOp(MKDIR, None, path))
+        return path
+
+    def move(self, src: str, dst: str, on_conflict: str = CONFLICT_SUFFIX) -> Optional[str]:
+        """
+        Plan moving src to dst (a full destination path, not a directory to move into).
+        Returns the final destination, or None if skipped because dst was taken.
+        """
+        if _key(src) == _key(dst):
+            return dst
+        if self.is_taken(dst):
+            if on_conflict == CONFLICT_SKIP:
+                self.skipped.append((src, dst))
+                return None
+            if on_conflict == CONFLICT_ERROR:
+                raise FileExistsError(f"destination exists: {dst}")
+            dst = self.free_name(dst)
+        self._add_move(src, dst)
+        return dst
+
+    def _add_move(self, src: str, dst: str) -> None:
+        dst_dir = os.path.dirname(os.path.abspath(dst))
+        if not self.is_dir(dst_dir):
+            self.mkdir(dst_dir)
+        self._names_in(os.path.dirname(os.path.abspath(src))).discard(os.path.normcase(os.path.basename(src)))
+        self._names_in(dst_dir).add(os.path.normcase(os.path.basename(dst)))
+        self.ops.append(FileOp(MOVE, src, dst))
+
+    def rename(self, src: str, new_name: str, on_conflict: str = CONFLICT_SUFFIX) -> Optional[str]:
+        """Plan renaming src to new_name in the same directory."""
+        return self.move(src, os.path.join(os.path.dirname(src), new_name), on_conflict)
+
+    def rename_many(self, renames: Iterable[Tuple[str, str]],
+                    on_conflict: str = CONFLICT_SKIP) -> Dict[str, Optional[str]]:
+        """
+        Plan a whole src -> dst mapping at once, where destinations may be the
+        sources of other renames (renumbering IMG_FI_20001_1 -> IMG_FI_20002_1 -> ...).
+        Chains are ordered so each destination is vacated before it is filled;
+        each cycle parks one file under a temporary name, moves the rest of
+        the cycle, then moves the parked file into place. One O(n) pass, and a
+        destination only counts as taken if its file is not being renamed itself.
+        Returns src -> final destination (None = skipped).
+        """
+        final: Dict[str, Optional[str]] = {}
+        items: Dict[str, Tuple[str, str]] = {}   # src key -> (src, dst)
+        for src, dst in renames:
+            if _key(src) == _key(dst):
+                final[src] = dst
+            else:
+                items[_key(src)] = (src, dst)
+
+        # destinations held by a file that stays put, or claimed twice
+        target: Dict[str, Optional[str]] = {}
+        claimed: Set[str] = set()
+        for k, (src, dst) in items.items():
+            dst_key = _key(dst)
+            if dst_key in claimed or (dst_key not in items and self.is_taken(dst)):
+                if on_conflict == CONFLICT_ERROR:
+                    raise FileExistsError(f"destination exists: {dst}")
+                if on_conflict == CONFLICT_SKIP:
+                    self.skipped.append((src, dst))
+                    target[k] = None
+                    continue
+                dst = self.free_name(dst)
+                while _key(dst) in claimed or _key(dst) in items:
+                    folder, name = os.path.split(dst)
+                    self._names_in(folder).add(os.path.normcase(name))
+                    dst = self.free_name(dst)
+                dst_key = _key(dst)
+            target[k] = dst
+            claimed.add(dst_key)
+
+        placed: Dict[str, bool] = {}  # src key -> moved (True) / left in place (False)
+        for start in items:
+            if start in placed:
+                continue
+            # follow the chain src -> dst -> (dst as another src) -> ...
+            path: List[str] = []
+            on_path: Dict[str, int] = {}
+            k = start
+            while True:
+                on_path[k] = len(path)
+                path.append(k)
+                dst = target[k]
+                if dst is None:
+                    blocked, cycle_at = True, None
+                    break
+                nxt = _key(dst)
+                if nxt not in items or placed.get(nxt) is True:
+                    blocked, cycle_at = False, None  # destination free, or vacated already
+                    break
+                if placed.get(nxt) is False:
+                    blocked, cycle_at = True, None   # its file stays, so this one can't move
+                    break
+                if nxt in on_path:
+                    blocked, cycle_at = False, on_path[nxt]
+                    break
+                k = nxt
+
+            if blocked:
+                for k in path:
+                    placed[k] = False
+                    final[items[k][0]] = None
+                    if target[k] is not None:
+                        self.skipped.append((items[k][0], target[k]))
+                continue
+
+            parked = None
+            if cycle_at is not None:
+                src = items[path[cycle_at]][0]
+                parked = self.free_name(os.path.join(os.path.dirname(src), ".renaming_" + os.path.basename(src)))
+                self._add_move(src, parked)
+                self.parked += 1
+            for i in reversed(range(len(path))):
+                k = path[i]
+                src = parked if i == cycle_at else items[k][0]
+                self._add_move(src, target[k])
+                placed[k] = True
+                final[items[k][0]] = target[k]
+        return final
+
+
+# ==============================
+# Undo Journal
+# ==============================
+
+class OpJournal:
+    """
+    Append-only JSON-lines journal of one plan: every operation is written as
+    a "plan" record before the first one runs, then a "done" / "failed" /
+    "undone" record per operation as it completes. That is enough to resume an
+    interrupted run (resume_journal) or reverse a finished one (undo_journal).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._f = open(path, "a", encoding="utf-8")
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+
+    def write_plan(self, ops: List[FileOp]) -> None:
+        with self._lock:
+            for seq, op in enumerate(ops):
+                self._f.write(json.dumps({"op": "plan", "seq": seq, "kind": op.kind, "src": op.src,
+                                          "dst": op.dst}, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._f.close()
+
+
+def default_journal_path(label: str) -> str:
+    return os.path.join(JOURNAL_DIR, f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jsonl")
+
+
+def read_journal(path: str) -> Tuple[List[FileOp], Dict[int, str]]:
+    """(planned operations in order, seq -> latest status). A torn last line is ignored."""
+    ops: Dict[int, FileOp] = {}
+    status: Dict[int, str] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record["op"] == "plan":
+                ops[record["seq"]] = FileOp(record["kind"], record["src"], record["dst"])
+            else:
+                status[record["seq"]] = record["op"]
+    return [ops[seq] for seq in sorted(ops)], status
+
+
+# ==============================
+# Execution
+# ==============================
+
+class OpResult:
+    def __init__(self, journal_path: str):
+        self.journal_path = journal_path
+        self.done = 0
+        self.completed: List[FileOp] = []  # in completion order
+        self.failed: List[Tuple[FileOp, str]] = []
+
+    def summary(self) -> str:
+        return f"{self.done} done, {len(self.failed)} failed (journal: {self.journal_path})"
+
+
+def _copy_move(src: str, dst: str) -> None:
+    """Cross-device move: copy to a temporary name, rename into place, then delete src."""
+    tmp = dst + ".partial"
+    if os.path.isdir(src) and not os.path.islink(src):
+        shutil.rmtree(tmp, ignore_errors=True)
+        shutil.copytree(src, tmp, symlinks=True)
+        os.replace(tmp, dst)
+        shutil.rmtree(src)
+    else:
+        shutil.copy2(src, tmp, follow_symlinks=False)
+        os.replace(tmp, dst)
+        os.remove(src)
+
+
+def _same_copy(src: str, dst: str) -> bool:
+    """dst is a finished copy of file src (a cross-device move interrupted before deleting src)."""
+    try:
+        a, b = os.lstat(src), os.lstat(dst)
+    except OSError:
+        return False
+    return (os.path.isfile(src) and a.st_size == b.st_size
+            and int(a.st_mtime) == int(b.st_mtime) and a.st_dev != b.st_dev)
+
+
+def _apply(op: FileOp, resuming: bool = False) -> None:
+    if op.kind == MKDIR:
+        os.makedirs(op.dst, exist_ok=True)
+        return
+    if op.kind == RMDIR:
+        if os.path.isdir(op.dst):
+            os.rmdir(op.dst)  # fails (and is reported) if something was added since
+        return
+    if not os.path.lexists(op.src):
+        if resuming and os.path.lexists(op.dst):
+            return  # already moved by the interrupted run
+        # on a fresh run a dst here is someone else's file; never journal it as ours
+        raise FileNotFoundError(errno.ENOENT, "source vanished since planning", op.src)
+    if os.path.lexists(op.dst):
+        if resuming and _same_copy(op.src, op.dst):
+            os.remove(op.src)
+            return
+        raise FileExistsError(errno.EEXIST, "destination exists", op.dst)
+    try:
+        os.rename(op.src, op.dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        _copy_move(op.src, op.dst)
+
+
+class _DeviceCache:
+    """st_dev of directories, so each destination directory is stat'd once."""
+
+    def __init__(self):
+        self._devs: Dict[str, int] = {}
+
+    def dev_of_dir(self, folder: str) -> Optional[int]:
+        key = _key(folder)
+        dev = self._devs.get(key)
+        if dev is None:
+            probe = os.path.abspath(folder)
+            while not os.path.exists(probe) and os.path.dirname(probe) != probe:
+                probe = os.path.dirname(probe)  # not created yet: it will be on its parent's device
+            try:
+                dev = self._devs[key] = os.stat(probe).st_dev
+            except OSError:
+                return None
+        return dev
+
+    def is_cross_device(self, op: FileOp) -> bool:
+        try:
+            src_dev = os.lstat(op.src).st_dev
+        except OSError:
+            return False
+        dst_dev = self.dev_of_dir(os.path.dirname(os.path.abspath(op.dst)))
+        return dst_dev is not None and src_dev != dst_dev
+
+
+def _run(items: List[Tuple[int, FileOp]], journal: OpJournal, workers: int, status: str,
+         desc: str, interrupted: Set[int] = frozenset()) -> OpResult:
+    """
+    Run (seq, op) in order. Same-device moves and directory operations are
+    metadata-only and run inline; cross-device moves (copy + delete) go to a
+    pool of `workers` threads. An operation that touches a path still being
+    copied, moves a directory or removes one, first waits for the copies in flight.
+    interrupted: seqs that were in flight when an earlier run stopped, the only
+    ones whose missing source may mean the move already happened (see _apply).
+    """
+    result = OpResult(journal.path)
+    lock = threading.Lock()
+    devices = _DeviceCache()
+    in_flight: Dict[Future, Set[str]] = {}
+    busy: Set[str] = set()
+
+    with tqdm(total=len(items), desc=desc, unit="op") as bar:
+        def finish(seq: int, op: FileOp, error: Optional[BaseException]) -> None:
+            if error is None:
+                journal.write({"op": status, "seq": seq})
+                with lock:
+                    result.done += 1
+                    result.completed.append(op)
+            else:
+                journal.write({"op": "failed", "seq": seq, "error": str(error)})
+                with lock:
+                    result.failed.append((op, str(error)))
+                tqdm.write(f"❌ {op.kind} {op.src or ''} -> {op.dst}: {error}")
+            bar.update()
+
+        def copy_job(seq: int, op: FileOp) -> None:
+            try:
+                _apply(op, seq in interrupted)
+            except OSError as e:
+                finish(seq, op, e)
+            else:
+                finish(seq, op, None)
+
+        def drain() -> None:
+            for future in list(in_flight):
+                future.result()
+            in_flight.clear()
+            busy.clear()
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="file-op") as pool:
+            for seq, op in items:
+                paths = {_key(op.dst)} if op.src is None else {_key(op.src), _key(op.dst)}
+                if in_flight and (paths & busy or op.kind == RMDIR
+                                  or (op.kind == MOVE and os.path.isdir(op.src))):
+                    drain()
+                if op.kind == MOVE and devices.is_cross_device(op):
+                    in_flight[pool.submit(copy_job, seq, op)] = paths
+                    busy.update(paths)
+                    continue
+                try:
+                    _apply(op, seq in interrupted)
+                except OSError as e:
+                    finish(seq, op, e)
+                else:
+                    finish(seq, op, None)
+            drain()
+    return result
+
+
+def execute_plan(plan: OpPlan, journal_path: Optional[str] = None, workers: int = 4,
+                 label: str = "file_ops") -> OpResult:
+    """
+    Run a plan, journaling every operation for resume_journal / undo_journal.
+    journal_path defaults to file_ops_journal/<label>_<timestamp>.jsonl.
+    """
+    journal = OpJournal(journal_path or default_journal_path(label))
+    try:
+        journal.write_plan(plan.ops)
+        print(f"🧾 Undo journal: {journal.path}")
+        result = _run(list(enumerate(plan.ops)), journal, workers, "done", label)
+    finally:
+        journal.close()
+    print(f"✅ {label}: {result.summary()}")
+    return result
+
+
+def resume_journal(journal_path: str, workers: int = 4) -> OpResult:
+    """
+    Finish an interrupted run: retry every planned operation not recorded as done.
+    Operations without any status were cut off mid-flight and may already be
+    complete on disk; ones recorded as failed are retried as on a fresh run.
+    """
+    ops, status = read_journal(journal_path)
+    items = [(seq, op) for seq, op in enumerate(ops) if status.get(seq) not in ("done", "undone")]
+    interrupted = {seq for seq, _ in items if seq not in status}
+    journal = OpJournal(journal_path)
+    try:
+        result = _run(items, journal, workers, "done", "Resuming", interrupted)
+    finally:
+        journal.close()
+    print(f"✅ Resumed: {result.summary()}")
+    return result
+
+
+def undo_journal(journal_path: str, workers: int = 4) -> OpResult:
+    """Reverse every completed operation of a run, newest first."""
+    ops, status = read_journal(journal_path)
+    items = []
+    for seq in sorted((s for s, st in status.items() if st == "done"), reverse=True):
+        op = ops[seq]
+        if op.kind == MOVE:
+            items.append((seq, FileOp(MOVE, op.dst, op.src)))
+        elif op.kind == MKDIR:
+            items.append((seq, FileOp(RMDIR, None, op.dst)))
+    journal = OpJournal(journal_path)
+    try:
+        result = _run(items, journal, workers, "undone", "Undoing")
+    finally:
+        journal.close()
+    print(f"↩️ Undone: {result.summary()}")
+    return result
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3 or sys.argv[1] not in ("resume", "undo"):
+        print("usage: python -m functions.file_ops resume|undo <journal.jsonl>")
+        sys.exit(1)
+    if sys.argv[1] == "resume":
+        resume_journal(sys.argv[2])
+    else:
+        undo_journal(sys.argv[2])
@@ -0,0 +1,167 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# ==============================
+# inotify Constants
+# ==============================
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (then len bytes of name)
+
+CHANGED = "changed"          # file created, written, moved in or touched
+DELETED = "deleted"          # file deleted or moved away
+DELETED_DIR = "deleted_dir"  # directory (and everything under it) deleted or moved away
+OVERFLOW = "overflow"        # kernel queue overflowed; events were lost, rescan the root
+
+
+class WatchEvent(NamedTuple):
+    name: str      # name the root was added under (e.g. the registry mode)
+    kind: str      # CHANGED / DELETED / DELETED_DIR / OVERFLOW
+    rel_path: str  # relative to the root, "/"-separated ("" for OVERFLOW)
+
+
+def _libc():
+    if not sys.platform.startswith("linux"):
+        raise OSError("watch mode needs Linux inotify")
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    return libc
+
+
+# ==============================
+# Recursive Tree Watcher
+# ==============================
+
+class TreeWatcher:
+    """
+    Recursive inotify watch over one or more named folder trees.
+    inotify only watches single directories, so every directory gets its own
+    watch; directories created or moved in later are added (and their files
+    reported as CHANGED) as their events arrive. Symlinked directories are not
+    followed, like iter_files.
+    """
+
+    def __init__(self):
+        self._libc = _libc()
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._dirs: Dict[int, Tuple[str, str, str]] = {}  # wd -> (name, root, rel_dir "a/b/")
+        self._roots: Dict[str, str] = {}
+
+    def add_root(self, name: str, root: str) -> int:
+        """Watch every directory under root; returns how many are watched."""
+        self._roots[name] = root
+        self._add_tree(name, root, "")
+        return sum(1 for n, _, _ in self._dirs.values() if n == name)
+
+    def _add_watch(self, name: str, root: str, rel_dir: str) -> bool:
+        path = os.path.join(root, rel_dir) if rel_dir else root
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                print(f"⚠️ Out of inotify watches at {path}; raise fs.inotify.max_user_watches")
+            elif err not in (errno.ENOENT, errno.ENOTDIR):
+                print(f"⚠️ Cannot watch {path}: {os.strerror(err)}")
+            return False
+        # re-adding a moved directory returns its existing wd; this re-points it
+        self._dirs[wd] = (name, root, rel_dir)
+        return True
+
+    def _add_tree(self, name: str, root: str, rel_dir: str) -> List[str]:
+        """Watch rel_dir and its subdirectories; returns the rel_paths of the files found."""
+        files: List[str] = []
+        stack = [rel_dir]
+        while stack:
+            rel_dir = stack.pop()
+            if not self._add_watch(name, root, rel_dir):
+                continue
+            try:
+                with os.scandir(os.path.join(root, rel_dir) if rel_dir else root) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(rel_dir + entry.name + "/")
+                        else:
+                            files.append(rel_dir + entry.name)
+            except OSError as e:
+                print(f"⚠️ Error reading {rel_dir or root}: {e}")
+        return files
+
+    def _drop_tree(self, name: str, rel_dir: str) -> None:
+        for wd, (n, _, d) in list(self._dirs.items()):
+            if n == name and d.startswith(rel_dir):
+                self._libc.inotify_rm_watch(self.fd, wd)
+                self._dirs.pop(wd, None)
+
+    def read(self, timeout: Optional[float] = None) -> List[WatchEvent]:
+        """Wait up to timeout seconds (None = forever) and return the decoded events."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        events: List[WatchEvent] = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                raw_name = data[offset + _EVENT.size: offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                self._decode(wd, mask, os.fsdecode(raw_name), events)
+        return events
+
+    def _decode(self, wd: int, mask: int, child: str, events: List[WatchEvent]) -> None:
+        if mask & IN_Q_OVERFLOW:
+            events.extend(WatchEvent(name, OVERFLOW, "") for name in self._roots)
+            return
+        if mask & IN_IGNORED:
+            self._dirs.pop(wd, None)  # directory gone; its parent reports the deletion
+            return
+        watched = self._dirs.get(wd)
+        if watched is None or mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            return
+        name, root, rel_dir = watched
+        rel_path = rel_dir + child
+
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                events.extend(WatchEvent(name, CHANGED, p) for p in self._add_tree(name, root, rel_path + "/"))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self._drop_tree(name, rel_path + "/")
+                events.append(WatchEvent(name, DELETED_DIR, rel_path))
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            events.append(WatchEvent(name, DELETED, rel_path))
+        elif mask & (IN_CREATE | IN_CLOSE_WRITE | IN_MOVED_TO | IN_ATTRIB):
+            events.append(WatchEvent(name, CHANGED, rel_path))
+
+    def close(self) -> None:
+        os.close(self.fd)
@@ -0,0 +1,172 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from functions.hashing import file_md5
+
+CACHE_DIR_NAME = "tf1-fileops"
+CACHE_FILE_NAME = "hash_cache.db"
+DEFAULT_MAX_ENTRIES = 2_000_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    dev       INTEGER NOT NULL,
+    inode     INTEGER NOT NULL,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    md5       TEXT NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (dev, inode)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_last_used ON cache (last_used);
+"""
+
+Key = Tuple[int, int]  # (dev, inode)
+
+
+def default_cache_path() -> str:
+    """
+    Where the shared cache lives: $HASH_CACHE_PATH if set, otherwise one file
+    per user (%LOCALAPPDATA%\\tf1-fileops on Windows, $XDG_CACHE_HOME or
+    ~/.cache/tf1-fileops elsewhere), so every tool finds the same cache
+    whatever directory it is started from. Read at call time, not import.
+    """
+    path = os.environ.get("HASH_CACHE_PATH")
+    if path:
+        return path
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    cache_dir = os.path.join(base, CACHE_DIR_NAME)
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, CACHE_FILE_NAME)
+
+
+class HashCache:
+    """
+    Local md5 cache shared by every tool that hashes files, keyed by stat identity.
+    An entry is valid only while the file's (dev, inode, size, mtime_ns) all match,
+    so a renamed or moved file on the same volume is still a hit.
+    Writes are buffered and flushed every flush_every puts; on close() the
+    least recently used entries are evicted if the cache holds more than max_entries.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 flush_every: int = 1000):
+        path = path or default_cache_path()
+        self.path = path
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending: Dict[Key, Tuple[int, int, str]] = {}
+        self._touched: Set[Key] = set()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    # --- lookups ---
+
+    def lookup(self, dev: int, inode: int, size: int, mtime_ns: int) -> Optional[str]:
+        """Cached md5 for this stat identity, or None."""
+        if not inode:
+            return None  # filesystem without stable inode numbers
+        key = (dev, inode)
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._conn.execute(
+                    "SELECT size, mtime_ns, md5 FROM cache WHERE dev = ? AND inode = ?", key
+                ).fetchone()
+            if entry is not None and entry[0] == size and entry[1] == mtime_ns:
+                self._touched.add(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            return None
+
+    def store(self, dev: int, inode: int, size: int, mtime_ns: int, md5: str) -> None:
+        if not inode:
+            return
+        with self._lock:
+            self._pending[(dev, inode)] = (size, mtime_ns, md5)
+            if len(self._pending) >= self.flush_every:
+                self._flush_locked()
+
+    def file_md5(self, path: str) -> str:
+        """md5 of path, read from the cache when its stat identity is unchanged."""
+        st = os.stat(path)
+        md5 = self.lookup(st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        if md5 is None:
+            md5 = file_md5(path)
+            self.store(st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, md5)
+        return md5
+
+    # --- persistence ---
+
+    def _flush_locked(self) -> None:
+        now = int(time.time())
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (dev, inode, size, mtime_ns, md5, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((dev, inode, size, mtime_ns, md5, now)
+                 for (dev, inode), (size, mtime_ns, md5) in self._pending.items()),
+            )
+            self._conn.executemany(
+                "UPDATE cache SET last_used = ? WHERE dev = ? AND inode = ?",
+                ((now, dev, inode) for dev, inode in self._touched - self._pending.keys()),
+            )
+            self._pending.clear()
+            self._touched.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def evict(self) -> int:
+        """Drop least recently used entries down to 90% of max_entries. Returns how many."""
+        with self._lock, self._conn:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+            if count <= self.max_entries:
+                return 0
+            excess = count - int(self.max_entries * 0.9)
+            self._conn.execute(
+                "DELETE FROM cache WHERE (dev, inode) IN "
+                "(SELECT dev, inode FROM cache ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            return excess
+
+    def close(self) -> None:
+        self.flush()
+        self.evict()
+        self._conn.close()
+
+
+# ==============================
+# Shared Default Cache
+# ==============================
+
+_default_cache: Optional[HashCache] = None
+_default_lock = threading.Lock()
+
+
+def get_hash_cache() -> HashCache:
+    """The process-wide cache at default_cache_path() (flushed at exit)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HashCache()
+            atexit.register(_default_cache.close)
+        return _default_cache
+
+
+def cached_file_md5(path: str) -> str:
+    """Drop-in for file_md5 that consults the shared hash cache first."""
+    return get_hash_cache().file_md5(path)
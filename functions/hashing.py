@@ -0,0 +1,104 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Iterable, Optional
+
+from functions.io_governor import IOGovernor, current_governor
+
+DEFAULT_ALGORITHMS = ("md5",)
+
+SMALL_FILE = 256 * 1024
+LARGE_FILE = 64 * 1024 * 1024
+
+_local = threading.local()
+
+# ==============================
+# Buffers
+# ==============================
+
+def pick_buffer_size(file_size: Optional[int] = None) -> int:
+    """Read size for a file: the whole file when small, 1 MiB normally, 4 MiB for big files."""
+    if file_size is not None and file_size <= SMALL_FILE:
+        return max(file_size, 4096)
+    if file_size is not None and file_size >= LARGE_FILE:
+        return 4 * 1024 * 1024
+    return 1024 * 1024
+
+
+def _buffer(size: int) -> memoryview:
+    """Per-thread reusable read buffer of at least size bytes."""
+    buf = getattr(_local, "buffer", None)
+    if buf is None or len(buf) < size:
+        buf = _local.buffer = memoryview(bytearray(size))
+    return buf[:size]
+
+
+def advise_sequential(fd: int, file_size: int) -> None:
+    """
+    Tell the kernel the file will be read front to back (larger readahead) and
+    to start fetching its first LARGE_FILE bytes now. No-op where posix_fadvise
+    doesn't exist (Windows, macOS).
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, 0, min(file_size, LARGE_FILE), os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass  # e.g. pipes, some network filesystems
+
+
+# ==============================
+# Digests
+# ==============================
+
+def file_digests(
+    file_path: str,
+    algorithms: Iterable[str] = DEFAULT_ALGORITHMS,
+    buffer_size: Optional[int] = None,
+    file_size: Optional[int] = None,
+    governor: Optional[IOGovernor] = None,
+) -> Dict[str, str]:
+    """
+    Compute one or more hashlib digests of a file in a single read pass.
+    Returns {algorithm: hexdigest}, e.g. file_digests(p, ("md5", "blake2b")).
+    A single algorithm over a non-small file goes through hashlib.file_digest
+    when available; otherwise all hashers share one reused per-thread buffer
+    filled with readinto, so the read loop never allocates. Reads are announced
+    with posix_fadvise where supported.
+    governor: I/O rate limiter charged for every read; defaults to the
+    process-wide one from functions.io_governor.install_governor, if any.
+    """
+    if governor is None:
+        governor = current_governor()
+    algorithms = tuple(algorithms)
+    with open(file_path, "rb", buffering=0) as f:
+        if file_size is None:
+            file_size = os.fstat(f.fileno()).st_size
+        if buffer_size is None:
+            buffer_size = pick_buffer_size(file_size)
+        advise_sequential(f.fileno(), file_size)
+
+        if (governor is None and len(algorithms) == 1 and hasattr(hashlib, "file_digest")
+                and buffer_size >= SMALL_FILE):
+            return {algorithms[0]: hashlib.file_digest(f, algorithms[0]).hexdigest()}
+
+        hashers = [hashlib.new(a) for a in algorithms]
+        buf = _buffer(buffer_size)
+        remaining = file_size
+        while True:
+            if governor is not None and remaining > 0:
+                governor.throttle(min(buffer_size, remaining))
+            n = f.readinto(buf)
+            if not n:
+                break
+            remaining -= n
+            chunk = buf[:n]
+            for h in hashers:
+                h.update(chunk)
+    return {a: h.hexdigest() for a, h in zip(algorithms, hashers)}
+
+
+def file_md5(filepath: str, buffer_size: Optional[int] = None) -> str:
+    """Compute MD5 hash for a file."""
+    return file_digests(filepath, DEFAULT_ALGORITHMS, buffer_size)["md5"]
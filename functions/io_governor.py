@@ -0,0 +1,165 @@
+import os
+import signal
+import threading
+import time
+from typing import Optional
+
+MB = 1024 * 1024
+
+# ==============================
+# Token Bucket
+# ==============================
+
+class TokenBucket:
+    """
+    rate tokens/second, with up to burst_sec seconds' worth saved up. take() may overdraw the
+    bucket (a 4 MiB read against a 1 MiB/s limit is allowed) and returns how
+    long the caller must sleep to pay the debt back. rate None = unlimited.
+    """
+
+    def __init__(self, rate: Optional[float], burst_sec: float = 1.0):
+        self.burst_sec = burst_sec
+        self.set_rate(rate)
+
+    def set_rate(self, rate: Optional[float]) -> None:
+        self.rate = rate if rate else None
+        self.capacity = (self.rate or 0) * self.burst_sec
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+
+    def take(self, n: float) -> float:
+        if self.rate is None:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        self.tokens -= n
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+# ==============================
+# I/O Governor
+# ==============================
+
+class IOGovernor:
+    """
+    Caps the read bandwidth (MB/s) and read calls per second (IOPS) of every
+    thread that hashes through it, so a scan of a live volume has a predictable cost.
+
+    Limits can be changed while running:
+      - control_file: polled about once a second; lines like
+            mb_per_sec = 40
+            iops = 200
+        (0 or "off" = unlimited). The file is created with the current limits if missing.
+      - install_signal_handlers(): SIGUSR1 halves and SIGUSR2 doubles both limits (POSIX).
+    """
+
+    def __init__(self, mb_per_sec: Optional[float] = None, iops: Optional[float] = None,
+                 control_file: Optional[str] = None, poll_sec: float = 1.0):
+        self._lock = threading.RLock()  # signal handlers may run while the main thread holds it
+        self._bytes = TokenBucket(mb_per_sec * MB if mb_per_sec else None)
+        self._ops = TokenBucket(iops)
+        self.control_file = control_file
+        self.poll_sec = poll_sec
+        self._control_mtime: Optional[int] = None
+        self._next_poll = 0.0
+        if control_file is not None:
+            if os.path.exists(control_file):
+                self._poll_control_file(force=True)
+            else:
+                self._write_control_file()
+
+    # --- limits ---
+
+    @property
+    def mb_per_sec(self) -> Optional[float]:
+        return self._bytes.rate / MB if self._bytes.rate else None
+
+    @property
+    def iops(self) -> Optional[float]:
+        return self._ops.rate
+
+    def set_limits(self, mb_per_sec: Optional[float], iops: Optional[float]) -> None:
+        with self._lock:
+            self._bytes.set_rate(mb_per_sec * MB if mb_per_sec else None)
+            self._ops.set_rate(iops)
+        print(f"🚦 I/O limit: {_fmt(mb_per_sec, 'MB/s')}, {_fmt(iops, 'IOPS')}")
+
+    def scale(self, factor: float) -> None:
+        """Multiply both limits (unlimited stays unlimited)."""
+        mb, ops = self.mb_per_sec, self.iops
+        self.set_limits(mb * factor if mb else None, ops * factor if ops else None)
+
+    # --- throttling ---
+
+    def throttle(self, n_bytes: int, n_ops: int = 1) -> None:
+        """Account for one read of n_bytes, sleeping as long as the limits require."""
+        if self.control_file is not None:
+            self._poll_control_file()
+        with self._lock:
+            wait = max(self._bytes.take(n_bytes), self._ops.take(n_ops))
+        if wait > 0:
+            time.sleep(wait)
+
+    # --- runtime control ---
+
+    def _poll_control_file(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now < self._next_poll:
+            return
+        self._next_poll = now + self.poll_sec
+        try:
+            mtime = os.stat(self.control_file).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._control_mtime:
+            return
+        self._control_mtime = mtime
+        limits = {"mb_per_sec": self.mb_per_sec, "iops": self.iops}
+        try:
+            with open(self.control_file, encoding="utf-8") as f:
+                for line in f:
+                    key, sep, value = line.partition("=")
+                    key, value = key.strip(), value.strip().lower()
+                    if not sep or key not in limits:
+                        continue
+                    limits[key] = None if value in ("", "0", "off", "none") else float(value)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring control file {self.control_file}: {e}")
+            return
+        if limits != {"mb_per_sec": self.mb_per_sec, "iops": self.iops}:
+            self.set_limits(limits["mb_per_sec"], limits["iops"])
+
+    def _write_control_file(self) -> None:
+        with open(self.control_file, "w", encoding="utf-8") as f:
+            f.write(f"mb_per_sec = {self.mb_per_sec or 0:g}\n")
+            f.write(f"iops = {self.iops or 0:g}\n")
+        self._control_mtime = os.stat(self.control_file).st_mtime_ns
+
+    def install_signal_handlers(self) -> None:
+        """SIGUSR1 = half speed, SIGUSR2 = double speed. Main thread only; no-op without SIGUSR1."""
+        if not hasattr(signal, "SIGUSR1"):
+            return
+        signal.signal(signal.SIGUSR1, lambda *_: self.scale(0.5))
+        signal.signal(signal.SIGUSR2, lambda *_: self.scale(2.0))
+
+
+def _fmt(value: Optional[float], unit: str) -> str:
+    return f"{value:g} {unit}" if value else f"unlimited {unit}"
+
+
+# ==============================
+# Process-wide Governor
+# ==============================
+
+_governor: Optional[IOGovernor] = None
+
+
+def install_governor(governor: Optional[IOGovernor]) -> None:
+    """Throttle every file_digests call in this process through governor (None removes it)."""
+    global _governor
+    _governor = governor
+
+
+def current_governor() -> Optional[IOGovernor]:
+    return _governor
@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from datetime import datetime
+from typing import List, Tuple
+
+from tqdm import tqdm
+
+LOG_FORMATS = ("text", "jsonl")
+
+# ==============================
+# Operation Logger
+# ==============================
+
+class OpLogger:
+    """
+    Buffered log for bulk toolkit operations (folderize, ...).
+    log() only appends to an in-memory buffer; a background thread writes the
+    buffer to the log file, kept open, every flush_sec seconds (or sooner once
+    max_buffer messages are waiting). Per-file messages go to the file only;
+    summary() also prints to the console, so a 30k-file run shows progress and
+    totals instead of one line per move.
+
+    fmt "text":  2024-05-01 12:00:00 - 📦 Moving IMG_FI_20001_1.jpg -> FI_20001
+    fmt "jsonl": {"ts": "2024-05-01T12:00:00.123456", "msg": "...", <fields>}
+
+        with OpLogger("folderize_log.txt") as log:
+            log.log("📦 Moving ...", src=src, dst=dst)
+            log.summary("✅ Done")
+    """
+
+    def __init__(self, path: str, fmt: str = "text", flush_sec: float = 1.0, max_buffer: int = 10000):
+        if fmt not in LOG_FORMATS:
+            raise ValueError(f"fmt must be one of {LOG_FORMATS}, got {fmt!r}")
+        self.path = path
+        self.fmt = fmt
+        self.flush_sec = flush_sec
+        self.max_buffer = max_buffer
+        self._buffer: List[Tuple[float, str, dict]] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._stamp: Tuple[int, str] = (-1, "")  # last second formatted for text lines
+        self._f = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="op-logger", daemon=True)
+        self._thread.start()
+
+    # --- logging ---
+
+    def log(self, msg: str, console: bool = False, **fields) -> None:
+        """Queue one message (with optional structured fields for jsonl)."""
+        with self._lock:
+            self._buffer.append((time.time(), msg, fields))
+            full = len(self._buffer) >= self.max_buffer
+        if full:
+            self._wake.set()
+        if console:
+            tqdm.write(msg)  # keeps any progress bar intact
+
+    def summary(self, msg: str, **fields) -> None:
+        """Log a message and print it to the console."""
+        self.log(msg, console=True, **fields)
+
+    # --- writing ---
+
+    def _format(self, ts: float, msg: str, fields: dict) -> str:
+        if self.fmt == "jsonl":
+            record = {"ts": datetime.fromtimestamp(ts).isoformat(), "msg": msg}
+            record.update(fields)
+            return json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        second = int(ts)
+        if second != self._stamp[0]:
+            self._stamp = (second, datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S"))
+        return f"{self._stamp[1]} - {msg}\n"
+
+    def flush(self) -> None:
+        """Write everything queued so far."""
+        with self._lock:
+            pending, self._buffer = self._buffer, []
+        if not pending:
+            return
+        with self._write_lock:
+            self._f.write("".join(self._format(*entry) for entry in pending))
+            self._f.flush()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_sec)
+            self._wake.clear()
+            self.flush()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        self._f.close()
+
+    def __enter__(self) -> "OpLogger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
@@ -0,0 +1,123 @@
+from itertools import groupby
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from functions.registry_store import connect
+
+# ==============================
+# Registry Queries
+# ==============================
+
+class FileRecord(NamedTuple):
+    mode: str
+    path: str
+    md5: str
+    size: Optional[int]
+    mtime: Optional[float]
+
+
+_RECORD = "SELECT mode, path, md5, size, mtime FROM files"
+
+
+def _prefix_end(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class RegistryQuery:
+    """
+    Indexed lookups straight against the registry database, without loading
+    it into a DataFrame. Every query is answered through an index on the files
+    table (md5, path, (mode, md5), (mode, size) or the (mode, path) key) and
+    returns an iterator over the rows as they are read, so callers can stop early.
+    Paths are the "/"-separated paths relative to the mode's root.
+
+        with RegistryQuery("registry.db") as q:
+            for md5, paths in q.duplicates("prod"):
+                ...
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn = connect(db_path)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "RegistryQuery":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _records(self, sql: str, params: tuple = ()) -> Iterator[FileRecord]:
+        for row in self._conn.execute(sql, params):
+            yield FileRecord(*row)
+
+    # --- by hash / by path ---
+
+    def paths_for_md5(self, md5: str, mode: Optional[str] = None) -> Iterator[FileRecord]:
+        """Active files with this md5 (in every mode, or only in mode)."""
+        if mode is None:
+            return self._records(_RECORD + " WHERE md5 = ? ORDER BY mode, path", (md5,))
+        return self._records(_RECORD + " WHERE mode = ? AND md5 = ? ORDER BY path", (mode, md5))
+
+    def md5_for_path(self, path: str, mode: Optional[str] = None) -> Iterator[FileRecord]:
+        """The active file at path (in every mode, or only in mode)."""
+        if mode is None:
+            return self._records(_RECORD + " WHERE path = ? ORDER BY mode", (path,))
+        return self._records(_RECORD + " WHERE mode = ? AND path = ?", (mode, path))
+
+    def has_md5(self, md5: str, mode: Optional[str] = None) -> bool:
+        return next(iter(self.paths_for_md5(md5, mode)), None) is not None
+
+    # --- listings ---
+
+    def list_prefix(self, mode: str, prefix: str = "") -> Iterator[FileRecord]:
+        """Active files of mode under a directory prefix (e.g. "2023/shoot_a/"), in path order."""
+        if not prefix:
+            return self._records(_RECORD + " WHERE mode = ? ORDER BY path", (mode,))
+        return self._records(
+            _RECORD + " WHERE mode = ? AND path >= ? AND path < ? ORDER BY path",
+            (mode, prefix, _prefix_end(prefix)),
+        )
+
+    def size_range(self, mode: str, min_size: Optional[int] = None,
+                   max_size: Optional[int] = None) -> Iterator[FileRecord]:
+        """Active files of mode with min_size <= size <= max_size (either bound optional), by size."""
+        sql, params = _RECORD + " WHERE mode = ?", [mode]
+        if min_size is not None:
+            sql += " AND size >= ?"
+            params.append(min_size)
+        if max_size is not None:
+            sql += " AND size <= ?"
+            params.append(max_size)
+        if min_size is None and max_size is None:
+            sql += " AND size IS NOT NULL"
+        return self._records(sql + " ORDER BY size", tuple(params))
+
+    # --- across hashes ---
+
+    def only_in(self, mode: str, other: str) -> Iterator[str]:
+        """md5s with an active file in mode but none in other (e.g. in prod but not in raw)."""
+        for (md5,) in self._conn.execute(
+            "SELECT DISTINCT f.md5 FROM files AS f WHERE f.mode = ? AND NOT EXISTS "
+            "(SELECT 1 FROM files AS o WHERE o.mode = ? AND o.md5 = f.md5) ORDER BY f.md5",
+            (mode, other),
+        ):
+            yield md5
+
+    def duplicates(self, mode: str, min_count: int = 2) -> Iterator[Tuple[str, List[str]]]:
+        """(md5, paths) for every hash with at least min_count active files in mode."""
+        rows = self._conn.execute(
+            "SELECT md5, path FROM files WHERE mode = ? ORDER BY md5, path", (mode,)
+        )
+        for md5, group in groupby(rows, key=lambda r: r[0]):
+            paths = [path for _, path in group]
+            if len(paths) >= min_count:
+                yield md5, paths
+
+    def count(self, mode: Optional[str] = None) -> int:
+        """Number of active files (in every mode, or only in mode)."""
+        if mode is None:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        return self._conn.execute("SELECT COUNT(*) FROM files WHERE mode = ?", (mode,)).fetchone()[0]
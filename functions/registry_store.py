@@ -0,0 +1,388 @@
+import os
+import sqlite3
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import pandas as pd
+
+SQLITE_MAGIC = b"SQLite format 3\x00"
+
+# Shared read-only cells for empty set/dict columns (most rows only have files
+# in one mode and no history). Writers replace them with a real set/dict first.
+EMPTY_SET = frozenset()
+EMPTY_DICT = MappingProxyType({})
+
+
+class FileMeta:
+    """
+    Metadata of one active file, stored once and shared by its row's
+    file_metadata dict and the path index (instead of a tuple in each).
+    Reads as the (size, mtime, last_seen) tuple file_metadata has always held;
+    md5 is the row it belongs to, for path index lookups.
+    """
+
+    __slots__ = ("md5", "size", "mtime", "last_seen")
+
+    def __init__(self, md5: str, size: Optional[int], mtime: Optional[float],
+                 last_seen: Optional[datetime] = None):
+        self.md5 = md5
+        self.size = size
+        self.mtime = mtime
+        self.last_seen = last_seen
+
+    def __iter__(self):
+        return iter((self.size, self.mtime, self.last_seen))
+
+    def __getitem__(self, i):
+        return (self.size, self.mtime, self.last_seen)[i]
+
+    def __len__(self) -> int:
+        return 3
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (FileMeta, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"FileMeta({self.md5!r}, {self.size!r}, {self.mtime!r}, {self.last_seen!r})"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    md5       TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS files (
+    mode      TEXT NOT NULL,
+    path      TEXT NOT NULL,
+    md5       TEXT NOT NULL,
+    size      INTEGER,
+    mtime     REAL,
+    last_seen REAL,
+    PRIMARY KEY (mode, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_md5 ON files (md5);
+CREATE INDEX IF NOT EXISTS files_path ON files (path);
+CREATE INDEX IF NOT EXISTS files_mode_md5 ON files (mode, md5);
+CREATE INDEX IF NOT EXISTS files_mode_size ON files (mode, size);
+
+CREATE TABLE IF NOT EXISTS history (
+    md5       TEXT NOT NULL,
+    mode      TEXT NOT NULL,
+    path      TEXT NOT NULL,
+    removed   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_md5 ON history (md5);
+
+CREATE TABLE IF NOT EXISTS digests (
+    md5       TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    value     TEXT NOT NULL,
+    PRIMARY KEY (md5, algorithm)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS dir_fingerprints (
+    mode      TEXT NOT NULL,
+    rel_dir   TEXT NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    entries   INTEGER NOT NULL,
+    digest    TEXT NOT NULL,
+    PRIMARY KEY (mode, rel_dir)
+) WITHOUT ROWID;
+"""
+
+# ==============================
+# Connection Helpers
+# ==============================
+
+def is_registry_db(path: str) -> bool:
+    """True if path is a SQLite file (as opposed to a legacy pickle)."""
+    with open(path, "rb") as f:
+        header = f.read(len(SQLITE_MAGIC))
+    # empty: created but killed before the first commit, which SQLite opens as a new db
+    return header == SQLITE_MAGIC or header == b""
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Open the registry database, creating the schema if needed."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _to_epoch(ts) -> Optional[float]:
+    if ts is None or (isinstance(ts, float) and ts != ts):
+        return None
+    if isinstance(ts, datetime):
+        return ts.timestamp()
+    return float(ts)
+
+
+def _from_epoch(ts: Optional[float], memo: Optional[Dict[float, datetime]] = None) -> Optional[datetime]:
+    """datetime for an epoch; with memo, equal epochs share one datetime object."""
+    if ts is None:
+        return None
+    if memo is None:
+        return datetime.fromtimestamp(ts, timezone.utc)
+    dt = memo.get(ts)
+    if dt is None:
+        dt = memo[ts] = datetime.fromtimestamp(ts, timezone.utc)
+    return dt
+
+
+# ==============================
+# Read / Write
+# ==============================
+
+def modes_in_columns(columns: Iterable[str]) -> Tuple[str, ...]:
+    """Modes present in a registry DataFrame, from its filename_in_<mode> columns."""
+    return tuple(c[len("filename_in_"):] for c in columns if c.startswith("filename_in_"))
+
+
+def read_registry(db_path: str, modes: Iterable[str] = ("prod", "raw"),
+                  md5s: Optional[Iterable[str]] = None, only_modes: bool = False) -> pd.DataFrame:
+    """
+    Load the registry database into the md5-indexed DataFrame layout.
+    Empty cells share EMPTY_SET / EMPTY_DICT, each distinct path is one string
+    object (shared by the active set, file_metadata and history), and
+    timestamps written in the same batch share one datetime object.
+    md5s: only load these hashes (looked up through the md5 indexes).
+    only_modes: only load the files/history of `modes`, and only the hashes
+    that have some; otherwise modes found on disk also get their columns.
+    """
+    modes = tuple(modes)
+    # built column by column (no scratch dict per row), so little is left to free
+    rows: Dict[str, str] = {}                      # md5 -> its one string object, in row order
+    active: Dict[str, Dict[str, Set[str]]] = {}    # mode -> md5 -> paths
+    hist: Dict[str, Dict[str, set]] = {}           # mode -> md5 -> {(path, removed)}
+    meta: Dict[str, Dict[str, FileMeta]] = {}
+    digests: Dict[str, Dict[str, str]] = {}
+    stamps: Dict[float, datetime] = {}
+    paths: Dict[str, str] = {}
+
+    def cell(column: Dict[str, dict], md5: str, empty=dict):
+        value = column.get(md5)
+        if value is None:
+            value = column[md5] = empty()
+        return value
+
+    where, params = [], []
+    if only_modes:
+        where.append(f"mode IN ({', '.join('?' * len(modes))})")
+        params.extend(modes)
+    if md5s is not None:
+        where.append("md5 IN (SELECT md5 FROM temp.wanted)")
+    clause = (" WHERE " + " AND ".join(where)) if where else ""
+
+    conn = connect(db_path)
+    try:
+        if md5s is not None:
+            conn.execute("CREATE TEMP TABLE wanted (md5 TEXT PRIMARY KEY) WITHOUT ROWID")
+            conn.executemany("INSERT OR IGNORE INTO temp.wanted (md5) VALUES (?)", ((m,) for m in md5s))
+        if not only_modes:
+            # hashes without any file still get a row
+            for (md5,) in conn.execute(
+                "SELECT md5 FROM hashes" + (" WHERE md5 IN (SELECT md5 FROM temp.wanted)" if md5s is not None else "")
+            ):
+                rows[md5] = md5
+        for mode, path, md5, size, mtime, last_seen in conn.execute(
+            "SELECT mode, path, md5, size, mtime, last_seen FROM files" + clause, params
+        ):
+            md5 = rows.setdefault(md5, md5)
+            path = paths.setdefault(path, path)
+            cell(active.setdefault(mode, {}), md5, set).add(path)
+            cell(meta, md5)[path] = FileMeta(md5, size, mtime, _from_epoch(last_seen, stamps))
+        for md5, mode, path, removed in conn.execute(
+            "SELECT md5, mode, path, removed FROM history" + clause, params
+        ):
+            md5 = rows.setdefault(md5, md5)
+            path = paths.setdefault(path, path)
+            cell(hist.setdefault(mode, {}), md5, set).add((path, _from_epoch(removed, stamps)))
+        digest_clause = ""
+        if where:
+            # only the digests of the rows loaded
+            conn.execute("CREATE TEMP TABLE loaded (md5 TEXT PRIMARY KEY) WITHOUT ROWID")
+            conn.executemany("INSERT INTO temp.loaded (md5) VALUES (?)", ((m,) for m in rows))
+            digest_clause = " AND md5 IN (SELECT md5 FROM temp.loaded)"
+        for md5, algorithm, value in conn.execute(
+            "SELECT md5, algorithm, value FROM digests WHERE algorithm != 'md5'" + digest_clause
+        ):
+            cell(digests, rows.setdefault(md5, md5))[algorithm] = value
+    finally:
+        conn.close()
+
+    all_modes = list(modes)
+    if not only_modes:
+        # modes found on disk beyond the requested ones still get their columns
+        for m in list(active) + list(hist):
+            if m not in all_modes:
+                all_modes.append(m)
+
+    data = {"md5": list(rows)}
+    for m in all_modes:
+        column = active.get(m, {})
+        data[f"filename_in_{m}"] = [column.get(md5, EMPTY_SET) for md5 in rows]
+    for m in all_modes:
+        column = hist.get(m, {})
+        data[f"historical_{m}"] = [column.get(md5, EMPTY_SET) for md5 in rows]
+    data["file_metadata"] = [meta.get(md5, EMPTY_DICT) for md5 in rows]
+    data["digests"] = [digests.get(md5, EMPTY_DICT) for md5 in rows]
+
+    df = pd.DataFrame(data, dtype=object)
+    df.set_index("md5", inplace=True)
+    return df
+
+
+def lookup_path(db_path: str, mode: str, path: str) -> Optional[Tuple[str, Optional[int], Optional[float]]]:
+    """(md5, size, mtime) of one active file, read through the primary key, or None."""
+    conn = connect(db_path)
+    try:
+        return conn.execute(
+            "SELECT md5, size, mtime FROM files WHERE mode = ? AND path = ?", (mode, path)
+        ).fetchone()
+    finally:
+        conn.close()
+
+
+def stored_modes(db_path: str) -> Tuple[str, ...]:
+    """Every mode with active or historical files in the database."""
+    conn = connect(db_path)
+    try:
+        return stored_modes_of(conn)
+    finally:
+        conn.close()
+
+
+def stored_modes_of(conn: sqlite3.Connection) -> Tuple[str, ...]:
+    return tuple(m for (m,) in conn.execute(
+        "SELECT DISTINCT mode FROM files UNION SELECT DISTINCT mode FROM history"
+    ))
+
+
+def _row_records(md5: str, row: pd.Series, modes: Tuple[str, ...]):
+    """Flatten one DataFrame row into files/history/digests table records."""
+    meta = row["file_metadata"] if isinstance(row["file_metadata"], dict) else {}
+    files, history = [], []
+    row_digests = row.get("digests")
+    digests = [(md5, a, v) for a, v in row_digests.items()] if isinstance(row_digests, dict) else []
+    for mode in modes:
+        active = row[f"filename_in_{mode}"]
+        if isinstance(active, set):
+            for path in active:
+                size, mtime, last_seen = meta.get(path, (None, None, None))
+                files.append((mode, path, md5, size, mtime, _to_epoch(last_seen)))
+        hist = row.get(f"historical_{mode}")
+        if isinstance(hist, set):
+            for path, removed in hist:
+                history.append((md5, mode, path, _to_epoch(removed)))
+    return files, history, digests
+
+
+def write_registry(df: pd.DataFrame, db_path: str, md5s: Optional[Set[str]] = None) -> None:
+    """
+    Upsert registry rows into the database in one transaction.
+    md5s: only write these rows (the ones changed since the last save);
+    None rewrites the whole registry.
+    Only the modes in df's columns are replaced, so a DataFrame loaded for
+    some modes (read_registry(only_modes=True)) leaves the others untouched.
+    """
+    modes = modes_in_columns(df.columns)
+    mode_clause = f"mode IN ({', '.join('?' * len(modes))})"
+    conn = connect(db_path)
+    try:
+        with conn:
+            if md5s is None:
+                if set(stored_modes_of(conn)) <= set(modes):
+                    conn.execute("DELETE FROM files")
+                    conn.execute("DELETE FROM history")
+                    conn.execute("DELETE FROM digests")
+                    conn.execute("DELETE FROM hashes")
+                else:
+                    conn.execute("DELETE FROM files WHERE " + mode_clause, modes)
+                    conn.execute("DELETE FROM history WHERE " + mode_clause, modes)
+                targets = df.index
+            else:
+                targets = [m for m in md5s if m in df.index]
+
+            for md5 in targets:
+                files, history, digests = _row_records(md5, df.loc[md5], modes)
+                conn.execute("INSERT OR IGNORE INTO hashes (md5) VALUES (?)", (md5,))
+                if md5s is not None:
+                    conn.execute("DELETE FROM files WHERE md5 = ? AND " + mode_clause, (md5, *modes))
+                    conn.execute("DELETE FROM history WHERE md5 = ? AND " + mode_clause, (md5, *modes))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO files (mode, path, md5, size, mtime, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", files
+                )
+                conn.executemany(
+                    "INSERT INTO history (md5, mode, path, removed) VALUES (?, ?, ?, ?)", history
+                )
+                # a digest of the same content never changes, so they are only ever added
+                conn.executemany(
+                    "INSERT OR REPLACE INTO digests (md5, algorithm, value) VALUES (?, ?, ?)", digests
+                )
+    finally:
+        conn.close()
+
+
+# ==============================
+# Directory Fingerprints
+# ==============================
+
+def read_fingerprints(db_path: str) -> Dict[str, Dict[str, Tuple[int, int, str]]]:
+    """mode -> {rel_dir: (mtime_ns, entries, digest)} as recorded by the last completed scans."""
+    fingerprints: Dict[str, Dict[str, Tuple[int, int, str]]] = {}
+    conn = connect(db_path)
+    try:
+        for mode, rel_dir, mtime_ns, entries, digest in conn.execute(
+            "SELECT mode, rel_dir, mtime_ns, entries, digest FROM dir_fingerprints"
+        ):
+            fingerprints.setdefault(mode, {})[rel_dir] = (mtime_ns, entries, digest)
+    finally:
+        conn.close()
+    return fingerprints
+
+
+def write_fingerprints(db_path: str, mode: str, fingerprints: Dict[str, Tuple[int, int, str]]) -> None:
+    """Replace the stored directory fingerprints of one mode."""
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("DELETE FROM dir_fingerprints WHERE mode = ?", (mode,))
+            conn.executemany(
+                "INSERT INTO dir_fingerprints (mode, rel_dir, mtime_ns, entries, digest) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((mode, rel_dir, *fp) for rel_dir, fp in fingerprints.items()),
+            )
+    finally:
+        conn.close()
+
+
+# ==============================
+# Legacy Pickle Import
+# ==============================
+
+def import_pickle_registry(pickle_path: str, db_path: str) -> int:
+    """
+    One-shot conversion of a legacy pickle.pkl registry into a registry database.
+    Returns the number of hashes imported.
+    """
+    df = pd.read_pickle(pickle_path)
+    df.attrs.clear()
+    write_registry(df, db_path)
+    print(f"✅ Imported {len(df)} hashes from {pickle_path} into {db_path}")
+    return len(df)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("usage: python -m functions.registry_store <pickle.pkl> <registry.db>")
+        sys.exit(1)
+    import_pickle_registry(sys.argv[1], sys.argv[2])
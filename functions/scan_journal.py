@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# ==============================
+# Scan Journal
+# ==============================
+
+class ScanJournal:
+    """
+    Append-only JSON-lines log next to the registry (<registry>.journal).
+    Every hashed file is appended as soon as the registry writer receives it,
+    together with periodic per-mode walk cursors, so an interrupted scan loses
+    nothing since its last checkpoint. After a checkpoint the journal is
+    compacted down to the cursors of scans still in progress.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._f = open(path, "a", encoding="utf-8")
+
+    @staticmethod
+    def path_for(registry_path: str) -> str:
+        return registry_path + ".journal"
+
+    def append_update(self, mode: str, path: str, md5: str, size: int, mtime: float,
+                      digests: Optional[Dict[str, str]] = None) -> None:
+        self._write({"op": "update", "mode": mode, "path": path, "md5": md5,
+                     "size": size, "mtime": mtime, "digests": digests})
+
+    def append_cursor(self, mode: str, root: str, cursor: Optional[str]) -> None:
+        self._write({"op": "cursor", "mode": mode, "root": root, "cursor": cursor})
+
+    def _write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def compact(self, cursors: Dict[str, Tuple[str, Optional[str]]]) -> None:
+        """Replace the journal with just the given mode -> (root, cursor) records."""
+        tmp_path = self.path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as tmp:
+                for mode, (root, cursor) in cursors.items():
+                    tmp.write(json.dumps({"op": "cursor", "mode": mode, "root": root, "cursor": cursor},
+                                         ensure_ascii=False, separators=(",", ":")) + "\n")
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            self._f.close()
+            os.replace(tmp_path, self.path)
+            self._f = open(self.path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
+
+
+def replay_journal(path: str) -> Tuple[List[dict], Dict[str, Tuple[str, Optional[str]]]]:
+    """
+    Read a journal left by an interrupted scan.
+    Returns (update records in order, mode -> (root, cursor) of the latest cursor per mode).
+    A torn last line from a crash mid-write is ignored.
+    """
+    updates: List[dict] = []
+    cursors: Dict[str, Tuple[str, Optional[str]]] = {}
+    if not os.path.exists(path):
+        return updates, cursors
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("op") == "update":
+                updates.append(record)
+            elif record.get("op") == "cursor":
+                if record["cursor"] is None:
+                    cursors.pop(record["mode"], None)
+                else:
+                    cursors[record["mode"]] = (record["root"], record["cursor"])
+    return updates, cursors
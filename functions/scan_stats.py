@@ -0,0 +1,168 @@
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ==============================
+# Scan Statistics
+# ==============================
+
+class ScanStats:
+    """
+    Per-phase timings and throughput of one scan / hashing run.
+    Phases ("walk", "lookup", "hash", "merge", "checkpoint", ...) accumulate
+    wall and CPU seconds across threads, so a phase run by N workers can
+    exceed the run's total wall time. Counters are kept per mode.
+    Attach a tqdm bar with attach() to show live MB/s while hashing.
+    """
+
+    def __init__(self, name: str = "scan"):
+        self.name = name
+        self._lock = threading.Lock()
+        self.phases: Dict[str, Dict[str, float]] = {}   # phase -> {"wall", "cpu", "calls"}
+        self.counters: Dict[str, Dict[str, int]] = {}   # mode -> {counter: n}
+        self.bytes_hashed = 0
+        self.files_hashed = 0
+        self.cache_hits = 0                              # files whose hash came from the hash cache
+        self.checkpoints: List[float] = []               # duration of every checkpoint save
+        self.started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_rss: Optional[int] = None
+        self._bars: list = []
+        self._next_postfix = 0.0
+
+    # --- recording ---
+
+    def add(self, phase: str, wall: float, cpu: float = 0.0, calls: int = 1) -> None:
+        with self._lock:
+            p = self.phases.get(phase)
+            if p is None:
+                p = self.phases[phase] = {"wall": 0.0, "cpu": 0.0, "calls": 0}
+            p["wall"] += wall
+            p["cpu"] += cpu
+            p["calls"] += calls
+
+    @contextmanager
+    def phase(self, phase: str):
+        """Time a block (wall + CPU of the calling thread) into phase."""
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def count(self, mode: str, counter: str, n: int = 1) -> None:
+        with self._lock:
+            c = self.counters.setdefault(mode, {})
+            c[counter] = c.get(counter, 0) + n
+
+    def hashed(self, n_bytes: int) -> None:
+        """One file was read in full for hashing."""
+        with self._lock:
+            self.bytes_hashed += n_bytes
+            self.files_hashed += 1
+        self._update_bars()
+
+    def cache_hit(self) -> None:
+        """One file's hash came from the hash cache without reading it."""
+        with self._lock:
+            self.cache_hits += 1
+
+    def checkpoint(self, seconds: float) -> None:
+        with self._lock:
+            self.checkpoints.append(seconds)
+        self.add("checkpoint", seconds)
+
+    # --- live progress ---
+
+    def attach(self, bar) -> None:
+        """Show MB/s hashed so far in this tqdm bar's postfix."""
+        self._bars.append(bar)
+
+    @property
+    def mb_per_sec(self) -> float:
+        elapsed = (self.wall or time.perf_counter() - self.started) or 1e-9
+        return self.bytes_hashed / elapsed / 1e6
+
+    def _update_bars(self) -> None:
+        now = time.perf_counter()
+        if not self._bars or now < self._next_postfix:
+            return
+        self._next_postfix = now + 0.5
+        rate = f"{self.mb_per_sec:.1f} MB/s"
+        for bar in self._bars:
+            bar.set_postfix_str(rate, refresh=False)
+
+    # --- results ---
+
+    def finish(self) -> "ScanStats":
+        """Stop the clock and record process CPU time and peak RSS."""
+        self.wall = time.perf_counter() - self.started
+        self.cpu = time.process_time() - self._cpu_started
+        if resource is not None:
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.peak_rss = rss if sys.platform == "darwin" else rss * 1024  # bytes on macOS, KiB elsewhere
+        return self
+
+    def as_dict(self) -> dict:
+        files_seen = sum(c.get("files_seen", 0) for c in self.counters.values())
+        return {
+            "name": self.name,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "wall_sec": round(self.wall, 6),
+            "cpu_sec": round(self.cpu, 6),
+            "peak_rss_bytes": self.peak_rss,
+            "files_seen": files_seen,
+            "files_per_sec": round(files_seen / self.wall, 1) if self.wall else None,
+            "files_hashed": self.files_hashed,
+            "cache_hits": self.cache_hits,
+            "bytes_hashed": self.bytes_hashed,
+            "mb_per_sec": round(self.mb_per_sec, 2),
+            "checkpoints": len(self.checkpoints),
+            "checkpoint_sec_max": round(max(self.checkpoints), 6) if self.checkpoints else None,
+            "phases": {k: {"wall_sec": round(v["wall"], 6), "cpu_sec": round(v["cpu"], 6), "calls": v["calls"]}
+                       for k, v in self.phases.items()},
+            "counters": self.counters,
+        }
+
+    def write_jsonl(self, path: str) -> None:
+        """Append this run as one JSON line to a metrics file."""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.as_dict()) + "\n")
+
+    def summary(self) -> str:
+        lines = [f"⏱️ {self.name}: {self.wall:.2f}s wall, {self.cpu:.2f}s CPU, "
+                 f"{self.files_hashed} files / {self.bytes_hashed / 1e6:.1f} MB hashed "
+                 f"({self.mb_per_sec:.1f} MB/s)"]
+        for phase, p in sorted(self.phases.items(), key=lambda kv: -kv[1]["wall"]):
+            lines.append(f"   {phase:<12} {p['wall']:9.3f}s wall {p['cpu']:9.3f}s CPU  x{p['calls']}")
+        if self.peak_rss is not None:
+            lines.append(f"   peak RSS {self.peak_rss / 1e6:.0f} MB")
+        return "\n".join(lines)
+
+
+def timed_iter(iterable, stats: Optional[ScanStats], phase: str):
+    """Yield from iterable, charging the time spent producing each item to phase."""
+    if stats is None:
+        yield from iterable
+        return
+    it = iter(iterable)
+    while True:
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            item = next(it)
+        except StopIteration:
+            stats.add(phase, time.perf_counter() - wall, time.thread_time() - cpu, calls=0)
+            return
+        stats.add(phase, time.perf_counter() - wall, time.thread_time() - cpu)
+        yield item
@@ -1,14 +1,41 @@
 import os
 import hashlib
 import pickle
-import shutil
+import queue
+import stat
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone#, timedelta
-from typing import Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple, Union
 
 import pandas as pd
 from tqdm import tqdm
 
+from functions.disk_order import READ_ORDERS, sort_for_reading
+from functions.fs_watch import DELETED_DIR, OVERFLOW, TreeWatcher
+from functions.hash_cache import HashCache, get_hash_cache
+from functions.hashing import DEFAULT_ALGORITHMS, file_digests, file_md5
+from functions.io_governor import IOGovernor, install_governor
+from functions.scan_journal import ScanJournal, replay_journal
+from functions.scan_stats import ScanStats, timed_iter
+from functions.registry_store import (
+    EMPTY_DICT,
+    EMPTY_SET,
+    FileMeta,
+    import_pickle_registry,
+    is_registry_db,
+    modes_in_columns,
+    read_fingerprints,
+    read_registry,
+    write_fingerprints,
+    write_registry,
+)
+
+MODES = ("prod", "raw")
+INDEX_ATTR = "path_index"
+
 # ==============================
 # Registry Management
 # ==============================
@@ -31,40 +58,300 @@ def load_registry_v1(pickle_path: str) -> pd.DataFrame:
     df.set_index("md5", inplace=True)
     return df
 
-def load_registry(pickle_path: str) -> pd.DataFrame:
-    if os.path.exists(pickle_path):
-        return pd.read_pickle(pickle_path)
+def load_registry(pickle_path: str, modes: Optional[Iterable[str]] = None,
+                  md5s: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Load the registry database into a DataFrame, or create an empty one if not found.
+    Legacy pickle registries must be converted once with import_pickle_registry().
+
+    modes: only load these modes' files and history (e.g. ("prod",) for a
+    prod-only report or scan); the other modes stay untouched on disk.
+    md5s: only load these hashes. The result is read-only: it can be queried
+    but not scanned into or saved over the full registry.
+    Both read through the database indexes, so small queries don't pay for the
+    whole registry.
+    """
+    # results journaled by an interrupted scan since its last checkpoint
+    updates, cursors = replay_journal(ScanJournal.path_for(pickle_path))
+    if md5s is not None:
+        updates, cursors = [], {}  # a lookup never resumes a scan
+    elif modes is not None:
+        modes = tuple(modes)
+        pending = [m for m in dict.fromkeys(u["mode"] for u in updates) if m not in modes]
+        if pending:
+            # replaying them later would lose them at the next journal compaction
+            print(f"↩️ Also loading mode(s) {', '.join(pending)} to replay their journaled results")
+            modes += tuple(pending)
 
-    df = pd.DataFrame(columns=[
-        "md5",
-        "filename_in_prod",
-        "filename_in_raw",
-        "historical_prod",
-        "historical_raw",
-        "file_metadata",   # NEW
-    ])
-    df.set_index("md5", inplace=True)
+    if os.path.exists(pickle_path):
+        if not is_registry_db(pickle_path):
+            raise ValueError(
+                f"{pickle_path} is a legacy pickle registry; convert it once with "
+                f"import_pickle_registry({pickle_path!r}, <registry.db>)"
+            )
+        df = read_registry(pickle_path, modes if modes is not None else MODES,
+                           md5s=md5s, only_modes=modes is not None)
+    else:
+        df = pd.DataFrame(columns=[
+            "md5",
+            "filename_in_prod",
+            "filename_in_raw",
+            "historical_prod",
+            "historical_raw",
+            "file_metadata",   # NEW
+            "digests",         # {algorithm: hexdigest} beyond md5 (the index)
+        ])
+        df.set_index("md5", inplace=True)
+        if modes is not None:
+            df = df.drop(columns=[f"{c}_{m}" for c in ("filename_in", "historical")
+                                  for m in MODES if m not in modes])
+
+    index = df.attrs[INDEX_ATTR] = build_path_index(df)
+    index.source = os.path.abspath(pickle_path)
+    index.dirty = set()
+    index.modes = modes
+    index.subset = md5s is not None
+    if os.path.exists(pickle_path):
+        index.fingerprints = {m: fps for m, fps in read_fingerprints(pickle_path).items()
+                              if modes is None or m in modes}
+
+    index.cursors = {m: c for m, c in cursors.items() if modes is None or m in modes}
+    updates = [u for u in updates if modes is None or u["mode"] in modes]
+    if updates:
+        print(f"↩️ Replaying {len(updates)} journaled results into the registry")
+        df = update_registry_batch(df, [
+            RegistryUpdate(u["md5"], u["path"], u["mode"], u["size"], u["mtime"], u.get("digests"))
+            for u in updates
+        ])
     return df
 
 
 def save_registry(df: pd.DataFrame, pickle_path: str) -> None:
-    """Safely save registry to pickle using temp file + rename."""
-    tmp_path = pickle_path + ".tmp"
-    df.to_pickle(tmp_path)
-    shutil.move(tmp_path, pickle_path)
+    """
+    Checkpoint the registry to its database. Only rows touched since the last
+    save are upserted, so the cost follows the size of the changes.
+    """
+    index = get_path_index(df)
+    # rows a scan has not appended to df yet are written from a frame of their own
+    new_rows = index.new_rows
+    if index.dirty is not None and index.source == os.path.abspath(pickle_path):
+        # cleared only once written, so rows of a failed save go out with the next one
+        dirty = set(index.dirty)
+        dirty_new = {md5: new_rows[md5] for md5 in dirty if md5 in new_rows}
+        write_registry(df, pickle_path, {md5 for md5 in dirty if md5 not in dirty_new})
+        if dirty_new:
+            write_registry(_new_rows_frame(df, dirty_new), pickle_path, set(dirty_new))
+        index.dirty.difference_update(dirty)
+    elif index.subset:
+        raise ValueError("registry was loaded for selected hashes only; it cannot be written out in full")
+    else:
+        # unknown history (or a different target): write every row
+        write_registry(df, pickle_path)
+        if new_rows:
+            write_registry(_new_rows_frame(df, new_rows), pickle_path, set(new_rows))
+        index.source = os.path.abspath(pickle_path)
+        index.dirty = set()
+
+    for mode in list(index.fingerprints_changed):
+        write_fingerprints(pickle_path, mode, index.fingerprints.get(mode, {}))
+        index.fingerprints_changed.discard(mode)
+
+
+# ==============================
+# Path Index
+# ==============================
+
+class PathIndex(dict):
+    """
+    mode -> {rel_path: FileMeta} for every active file (md5, size, mtime, ...;
+    the same record as in its row's file_metadata).
+    Lives in df.attrs so scans can look a path up without touching the DataFrame.
+    Also tracks the md5 rows changed since the last save (`dirty`, None = unknown),
+    the database they were loaded from (`source`), which part of it was
+    loaded (`modes`, None = all; `subset` = only selected hashes), the
+    per-directory fingerprints of the last completed scan of each mode and the
+    walk cursors of interrupted scans.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.dirty: Optional[Set[str]] = None
+        self.source: Optional[str] = None
+        self.modes: Optional[Tuple[str, ...]] = None
+        self.subset = False
+        # mode -> {rel_dir: (mtime_ns, entries, digest)}
+        self.fingerprints: Dict[str, Dict[str, Tuple[int, int, str]]] = {}
+        self.fingerprints_changed: Set[str] = set()
+        # mode -> (root, rel_path) walk cursor of a scan that has not completed
+        self.cursors: Dict[str, Tuple[str, str]] = {}
+        # md5 -> {col: cell} of rows added by update_registry_batch(defer_new=True)
+        # but not yet appended to the DataFrame (see append_new_rows)
+        self.new_rows: Dict[str, dict] = {}
+
+    def __deepcopy__(self, memo):
+        # pandas deep-copies attrs onto derived frames; share the index instead
+        return self
+
+
+def build_path_index(df: pd.DataFrame) -> PathIndex:
+    """
+    Build the path index from the active sets and file_metadata of every row.
+    Metadata still held as plain tuples (e.g. an imported pickle) is replaced
+    by the index's FileMeta, so each file's record is stored once.
+    """
+    index = PathIndex()
+    for mode in modes_in_columns(df.columns):
+        paths = index[mode] = {}
+        active_col = f"filename_in_{mode}"
+        if active_col not in df.columns:
+            continue
+        for md5, active, meta in zip(df.index, df[active_col], df["file_metadata"]):
+            if not isinstance(active, set):
+                continue
+            if not isinstance(meta, dict):
+                meta = {}
+            for path in active:
+                record = meta.get(path)
+                if not isinstance(record, FileMeta) or record.md5 != md5:
+                    size, mtime, last_seen = record if record is not None else (None, None, None)
+                    record = FileMeta(md5, size, mtime, last_seen)
+                    if path in meta:
+                        meta[path] = record
+                paths[path] = record
+    return index
+
+
+def get_path_index(df: pd.DataFrame) -> PathIndex:
+    """Return the path index attached to df, building it if df didn't come from load_registry."""
+    index = df.attrs.get(INDEX_ATTR)
+    if index is None:
+        index = df.attrs[INDEX_ATTR] = build_path_index(df)
+    return index
 
 
 # ==============================
 # File Hashing
 # ==============================
 
-def hash_file(file_path: str, chunk_size: int = 8192) -> str:
-    """Return md5 hash of a file."""
-    md5 = hashlib.md5()
-    with open(file_path, "rb") as f:
-        while chunk := f.read(chunk_size):
-            md5.update(chunk)
-    return md5.hexdigest()
+def hash_file(file_path: str, chunk_size: Optional[int] = None) -> str:
+    """Return md5 hash of a file (chunk_size None picks a buffer size from the file size)."""
+    return file_md5(file_path, chunk_size)
+
+
+# ==============================
+# File Walking
+# ==============================
+
+class FileEntry(NamedTuple):
+    rel_path: str   # relative to the scanned folder, "/"-separated
+    size: int
+    mtime_ns: int
+    inode: int      # st_ino / st_dev are 0 on Windows, where DirEntry doesn't fill them
+    dev: int
+    # True when the file's directory fingerprint matched the last scan; the file
+    # was not stat'd and size/mtime_ns/inode/dev are 0
+    unchanged: bool = False
+
+    @property
+    def mtime(self) -> float:
+        """Float mtime exactly as os.stat().st_mtime reports it (what the registry stores)."""
+        return self.mtime_ns // 1_000_000_000 + (self.mtime_ns % 1_000_000_000) * 1e-9
+
+
+def dir_fingerprint(mtime_ns: int, names: List[str]) -> Tuple[int, int, str]:
+    """(mtime_ns, entry count, digest of the sorted child names) of one directory."""
+    digest = hashlib.md5("\0".join(sorted(names)).encode("utf-8", "surrogateescape")).hexdigest()
+    return mtime_ns, len(names), digest
+
+
+def walk_key(rel_path: str) -> Tuple[Tuple[int, str], ...]:
+    """
+    Sort key giving the order iter_files yields paths in: within a directory,
+    files (by name) come before subdirectories (by name, each walked fully).
+    """
+    parts = rel_path.split("/")
+    return tuple((1, p) for p in parts[:-1]) + ((0, parts[-1]),)
+
+
+def _subtree_before(rel_dir: str, key: Tuple[Tuple[int, str], ...]) -> bool:
+    """True if every path under rel_dir ("a/b/") sorts before key."""
+    dir_key = tuple((1, p) for p in rel_dir.rstrip("/").split("/"))
+    return key[:len(dir_key)] != dir_key and dir_key < key
+
+
+def iter_files(
+    folder_path: str,
+    fingerprints: Optional[Dict[str, Tuple[int, int, str]]] = None,
+    deep: bool = True,
+    resume_after: Optional[str] = None,
+) -> Iterator[FileEntry]:
+    """
+    Stream every file under folder_path using os.scandir, taking size/mtime/inode
+    from the DirEntry so no second stat or path join is needed per file.
+    Like os.walk, symlinked directories are not followed. The order is stable
+    (see walk_key), so a walk can be resumed.
+
+    fingerprints: rel_dir -> fingerprint from the last completed walk. Files in a
+    directory whose fingerprint still matches are yielded with unchanged=True and
+    without a stat (unless deep). Once the walk completes the dict is replaced
+    with the fingerprints seen in this walk.
+    resume_after: skip, without reading them, all files up to and including this
+    rel_path (the cursor of an interrupted walk).
+    """
+    resume_key = walk_key(resume_after) if resume_after else None
+    skipped_before = resume_key
+    seen: Dict[str, Tuple[int, int, str]] = {}
+    stack = [(folder_path, "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            if fingerprints is not None:
+                dir_mtime_ns = os.stat(dir_path).st_mtime_ns
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            print(f"⚠️ Error reading {dir_path}: {e}")
+            continue
+
+        unchanged = False
+        if fingerprints is not None:
+            fp = seen[rel_dir] = dir_fingerprint(dir_mtime_ns, [e.name for e in entries])
+            unchanged = not deep and fingerprints.get(rel_dir) == fp
+
+        subdirs = []
+        for entry in entries:
+            rel_path = rel_dir + entry.name
+            try:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        subdirs.append(rel_path + "/")
+                    continue
+                if resume_key is not None:
+                    if walk_key(rel_path) <= resume_key:
+                        continue  # walked before the interruption
+                    resume_key = None  # past the cursor; everything after is new
+                if unchanged:
+                    yield FileEntry(rel_path, 0, 0, 0, 0, unchanged=True)
+                    continue
+                st = entry.stat()
+            except OSError as e:
+                print(f"⚠️ Error processing {rel_path}: {e}")
+                continue
+            yield FileEntry(rel_path, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
+
+        for sub in reversed(subdirs):
+            if resume_key is not None and _subtree_before(sub, resume_key):
+                continue
+            stack.append((os.path.join(dir_path, sub[len(rel_dir):-1]), sub))
+
+    if fingerprints is not None:
+        if skipped_before is not None:
+            # directories skipped by the resume keep their previous fingerprints
+            for rel_dir, fp in fingerprints.items():
+                if rel_dir and rel_dir not in seen and _subtree_before(rel_dir, skipped_before):
+                    seen[rel_dir] = fp
+        fingerprints.clear()
+        fingerprints.update(seen)
 
 
 # ==============================
@@ -165,108 +452,562 @@ from pathlib import Path
 
 from pathlib import Path
 
-def scan_folder(
-    folder_path: str,
-    df: pd.DataFrame,
-    mode: str,
-    pickle_path: str,
-    save_every_n: int = 500,
-    save_every_sec: int = 300,
-) -> pd.DataFrame:
+# ==============================
+# Parallel Hashing Pipeline
+# ==============================
+
+class RegistryUpdate(NamedTuple):
+    md5: str
+    path: str
+    mode: str
+    size: int
+    mtime: float
+    digests: Optional[Dict[str, str]] = None
+
+
+class HashResult(NamedTuple):
+    mode: str
+    rel_path: str
+    md5: Optional[str]
+    size: int
+    mtime: float
+    is_new: bool
+    error: Optional[Exception] = None
+    digests: Optional[Dict[str, str]] = None
+    seq: int = -1
+
+
+class ScanCursor:
     """
-    Scan a folder (recursive), updating registry DataFrame.
-    mode: "prod" or "raw"
+    Low-water mark of one walk: the last walked path such that every file up to
+    it is either unchanged or already handed to the registry writer. Hash results
+    finish out of order, so a file still being hashed holds the cursor back.
     """
-    assert mode in {"prod", "raw"}
-    active_col = f"filename_in_{mode}"
-    historical_col = f"historical_{mode}"
 
-    # Gather all files in folder (recursive) as relative paths
-    file_paths = []
-    root_path = Path(folder_path)
-    for root, _, files in os.walk(folder_path):
-        for fname in files:
-            full_path = Path(root) / fname
-            rel_path = full_path.relative_to(root_path).as_posix()  # << patched here
-            file_paths.append(rel_path)
+    def __init__(self, start: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._inflight: Dict[int, Optional[str]] = {}  # seq -> position before that file
+        self._last = start
+        self._seq = 0
 
-    n_files = len(file_paths)
-    existing_paths: Set[str] = set()
+    def walked(self, rel_path: str) -> None:
+        """rel_path needs no hashing (unchanged or failed to stat)."""
+        with self._lock:
+            self._last = rel_path
 
-    # Counters
-    skipped, rehashed, new = 0, 0, 0
+    def submitted(self, rel_path: str) -> int:
+        """rel_path was sent to the hash workers; returns its sequence number."""
+        with self._lock:
+            self._seq += 1
+            self._inflight[self._seq] = self._last
+            self._last = rel_path
+            return self._seq
 
-    last_save_time = time.time()
+    def done(self, seq: int) -> None:
+        with self._lock:
+            self._inflight.pop(seq, None)
 
-    for i, rel_path in enumerate(tqdm(file_paths, desc=f"Scanning {mode}", unit="file")):
-        try:
-            full_path = Path(folder_path) / rel_path
-            stat = os.stat(full_path)
-            size, mtime = stat.st_size, stat.st_mtime
-            existing_paths.add(rel_path)
+    @property
+    def position(self) -> Optional[str]:
+        with self._lock:
+            if self._inflight:
+                return next(iter(self._inflight.values()))
+            return self._last
 
-            # --- Check if this file already exists in registry ---
-            found = False
-            if not df.empty:
-                # look for this relative path in any file_metadata dict
-                candidate_rows = df[df["file_metadata"].apply(
-                    lambda meta: isinstance(meta, dict) and rel_path in meta
-                )]
 
-                if not candidate_rows.empty:
-                    found = True
-                    md5 = candidate_rows.index[0]
-                    row = df.loc[md5]
-                    meta = row["file_metadata"]
+CURSOR_TICK = object()  # queued by walkers to have the writer journal their cursor
 
-                    stored_size, stored_mtime, _ = meta[rel_path]
 
-                    if stored_size == size and stored_mtime == mtime:
-                        skipped += 1
-                        continue
-                    else:
-                        # file changed → rehash
-                        md5 = hash_file(str(full_path))
-                        rehashed += 1
-                        df = update_registry(df, md5, rel_path, mode, size, mtime)
+class RegistryWriter(threading.Thread):
+    """
+    The one thread allowed to mutate the registry. Hash workers put HashResults
+    on `results`; the writer appends each to the scan journal, stages it, and
+    merges each batch into the registry with update_registry_batch right before
+    a checkpoint; hashes new to the registry are appended to the DataFrame only
+    on close. After a checkpoint the journal is compacted to the walk cursors.
+    Producers must acquire a `slots` permit per submitted file, which the writer
+    releases once the result is applied, so in-flight work stays bounded.
+    An error outside the handling of one result (e.g. the journal failing on a
+    cursor tick) stops the writer: it is kept in `error`, later results are
+    discarded with their permits released so producers don't block, and
+    scan_roots raises it once the writer is closed.
+    """
+
+    def __init__(self, df, pickle_path, save_every_n=500, save_every_sec=300, queue_size=256,
+                 journal: Optional[ScanJournal] = None, stats: Optional[ScanStats] = None):
+        super().__init__(name="registry-writer", daemon=True)
+        self.df = df
+        self.stats = stats
+        self.pickle_path = pickle_path
+        self.journal = journal
+        self.cursors: Dict[str, Tuple[str, ScanCursor]] = {}  # mode -> (root, cursor)
+        self.save_every_n = save_every_n
+        self.save_every_sec = save_every_sec
+        self.results: "queue.Queue[Optional[HashResult]]" = queue.Queue()
+        self.slots = threading.BoundedSemaphore(queue_size)
+        self.pending: List[RegistryUpdate] = []
+        self.rehashed: Dict[str, int] = Counter()  # per mode
+        self.new: Dict[str, int] = Counter()
+        self.error: Optional[BaseException] = None
+
+    def run(self):
+        try:
+            self.apply_results()
+        except BaseException as e:
+            self.error = e
+            print(f"❌ Registry writer stopped: {e!r}")
+            self.discard_results()
+
+    def discard_results(self) -> None:
+        """After a failure: drop results until close(), releasing their permits."""
+        while True:
+            result = self.results.get()
+            if result is None:
+                break
+            if result is not CURSOR_TICK:
+                self.slots.release()
+
+    def apply_results(self) -> None:
+        applied = 0
+        last_save_time = time.time()
+        while True:
+            result = self.results.get()
+            if result is None:
+                break
+            if result is CURSOR_TICK:
+                self.record_cursors()
+                continue
+            try:
+                if result.error is not None:
+                    raise result.error
+                self.pending.append(RegistryUpdate(
+                    result.md5, result.rel_path, result.mode, result.size, result.mtime, result.digests
+                ))
+                if self.journal is not None:
+                    started = time.perf_counter()
+                    self.journal.append_update(result.mode, result.rel_path, result.md5,
+                                               result.size, result.mtime, result.digests)
+                    if self.stats is not None:
+                        self.stats.add("journal", time.perf_counter() - started)
+                if result.is_new:
+                    self.new[result.mode] += 1
                 else:
-                    # not seen before → new file
-                    md5 = hash_file(str(full_path))
-                    new += 1
-                    df = update_registry(df, md5, rel_path, mode, size, mtime)
+                    self.rehashed[result.mode] += 1
+                applied += 1
+
+                # --- Periodic checkpoint save ---
+                if applied % self.save_every_n == 0 or (time.time() - last_save_time) > self.save_every_sec:
+                    self.flush()
+                    started = time.perf_counter()
+                    save_registry(self.df, self.pickle_path)
+                    if self.stats is not None:
+                        self.stats.checkpoint(time.perf_counter() - started)
+                    if self.journal is not None:
+                        self.record_cursors(journal=False)
+                        self.journal.compact(get_path_index(self.df).cursors)
+                    last_save_time = time.time()
+            except Exception as e:
+                print(f"⚠️ Error processing {result.rel_path}: {e}")
+            finally:
+                if result.mode in self.cursors:
+                    self.cursors[result.mode][1].done(result.seq)
+                self.slots.release()
+
+    def track(self, mode: str, root: str, cursor: ScanCursor) -> None:
+        """Journal the walk cursor of a scan feeding this writer."""
+        self.cursors[mode] = (root, cursor)
+
+    def record_cursors(self, journal: bool = True) -> None:
+        cursors = get_path_index(self.df).cursors
+        for mode, (root, cursor) in self.cursors.items():
+            position = cursor.position
+            if position is None:
+                continue
+            cursors[mode] = (root, position)
+            if journal and self.journal is not None:
+                self.journal.append_cursor(mode, root, position)
+
+    def flush(self) -> None:
+        """Merge the staged updates into the registry in one batch."""
+        pending, self.pending = self.pending, []
+        if self.stats is None:
+            self.df = update_registry_batch(self.df, pending, defer_new=True)
+            return
+        with self.stats.phase("merge"):
+            self.df = update_registry_batch(self.df, pending, defer_new=True)
+
+    def close(self) -> pd.DataFrame:
+        """Drain outstanding results, stop the thread and return the registry."""
+        self.results.put(None)
+        self.join()
+        self.flush()
+        self.df = append_new_rows(self.df)
+        if self.error is None:
+            self.record_cursors()
+            if self.journal is not None:
+                self.journal.sync()
+        return self.df
+
+
+def with_file_id(entry: FileEntry, full_path: str) -> FileEntry:
+    """
+    entry with its inode/dev filled in by os.stat if the walk left them 0:
+    on Windows DirEntry doesn't report them, while os.stat gives the file index
+    and volume serial number. Only called for files about to be hashed.
+    """
+    if entry.inode:
+        return entry
+    try:
+        st = os.stat(full_path)
+    except OSError:
+        return entry
+    return entry._replace(inode=st.st_ino, dev=st.st_dev)
 
-            if not found and df.empty:
-                # brand new registry
-                md5 = hash_file(str(full_path))
-                new += 1
-                df = update_registry(df, md5, rel_path, mode, size, mtime)
 
-            # --- Periodic checkpoint save ---
-            if (i + 1) % save_every_n == 0 or (time.time() - last_save_time) > save_every_sec:
-                save_registry(df, pickle_path)
-                last_save_time = time.time()
+def hash_entry(entry: FileEntry, full_path, algorithms=DEFAULT_ALGORITHMS,
+               hash_cache: Optional[HashCache] = None, stats: Optional[ScanStats] = None) -> Dict[str, str]:
+    """
+    Digests of one walked file (all algorithms in one read). With a hash_cache,
+    an md5-only hash of a file whose stat identity is cached (e.g. moved or
+    renamed on the same volume) is not re-read.
+    """
+    if hash_cache is not None:
+        entry = with_file_id(entry, full_path)
+    identity = (entry.dev, entry.inode, entry.size, entry.mtime_ns)
+    if hash_cache is not None and algorithms == DEFAULT_ALGORITHMS:
+        md5 = hash_cache.lookup(*identity)
+        if md5 is not None:
+            if stats is not None:
+                stats.cache_hit()
+            return {"md5": md5}
+    if stats is None:
+        digests = file_digests(full_path, algorithms, file_size=entry.size)
+    else:
+        with stats.phase("hash"):
+            digests = file_digests(full_path, algorithms, file_size=entry.size)
+        stats.hashed(entry.size)
+    if hash_cache is not None:
+        hash_cache.store(*identity, digests["md5"])
+    return digests
+
+
+def hash_job(writer: RegistryWriter, mode, entry: FileEntry, full_path, is_new,
+             algorithms=DEFAULT_ALGORITHMS, hash_cache: Optional[HashCache] = None, seq: int = -1) -> None:
+    """Worker body: hash one file and hand the result to the writer."""
+    rel_path, size, mtime = entry.rel_path, entry.size, entry.mtime
+    try:
+        digests = hash_entry(entry, full_path, algorithms, hash_cache, writer.stats)
+        result = HashResult(mode, rel_path, digests["md5"], size, mtime, is_new, digests=digests, seq=seq)
+    except Exception as e:
+        result = HashResult(mode, rel_path, None, size, mtime, is_new, e, seq=seq)
+    writer.results.put(result)
+
+
+def feed_hash_pool(
+    folder_path: str,
+    mode: str,
+    entries: Iterable[FileEntry],
+    known: Dict[str, FileMeta],
+    writer: RegistryWriter,
+    cursor: ScanCursor,
+    pool: ThreadPoolExecutor,
+    algorithms: Tuple[str, ...],
+    hash_cache: Optional[HashCache],
+    existing_paths: Set[str],
+    tick_every: int = 1000,
+    stop: Optional[threading.Event] = None,
+    read_order: Optional[str] = None,
+    order_window: int = 2048,
+) -> Tuple[int, int, int]:
+    """
+    Check each walked file against the path index and submit new/changed ones
+    to the hash pool. Returns (files seen, files skipped as unchanged, files
+    of those passed without a stat because their directory was unchanged).
+    read_order: "inode" or "extent" collects up to order_window files to hash
+    and submits them in on-disk order (see functions.disk_order), which cuts
+    seeking on spinning disks; None submits in walk order.
+    Stops early once `stop` is set.
+    """
+    n_files, skipped, unstatted = 0, 0, 0
+    stats = writer.stats
+    lookup_sec = 0.0
+    window = order_window if read_order else 1
+    pending: List[Tuple[FileEntry, str, bool, int]] = []  # entry, full path, is_new, cursor seq
+
+    def submit_pending():
+        if read_order:
+            # walked on Windows these have no inode yet; the order (and the hash cache) need it
+            pending[:] = [(with_file_id(entry, full_path), full_path, is_new, seq)
+                          for entry, full_path, is_new, seq in pending]
+        for entry, full_path, is_new, seq in sort_for_reading(
+            pending, lambda p: p[1], lambda p: p[0].inode, read_order
+        ):
+            writer.slots.acquire()  # blocks while the queue is full
+            pool.submit(hash_job, writer, mode, entry, full_path,
+                        is_new, algorithms, hash_cache, seq)
+        pending.clear()
+
+    for entry in entries:
+        if (stop is not None and stop.is_set()) or writer.error is not None:
+            break
+        rel_path = entry.rel_path
+        try:
+            n_files += 1
+            existing_paths.add(rel_path)
+            if n_files % tick_every == 0:
+                writer.results.put(CURSOR_TICK)
+
+            if entry.unchanged:
+                # directory untouched since the last scan
+                if rel_path in known:
+                    skipped += 1
+                    unstatted += 1
+                    cursor.walked(rel_path)
+                    continue
+                # ...but this file never made it into the registry
+                st = os.stat(os.path.join(folder_path, rel_path))
+                entry = FileEntry(rel_path, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
+            size, mtime = entry.size, entry.mtime
+
+            # --- Check if this file already exists in registry ---
+            started = time.perf_counter()
+            known_entry = known.get(rel_path)
+            unchanged = known_entry is not None and known_entry.size == size and known_entry.mtime == mtime
+            lookup_sec += time.perf_counter() - started
+            if unchanged:
+                skipped += 1
+                cursor.walked(rel_path)
+                continue
+
+            # new or changed → hash it off-thread
+            full_path = os.path.join(folder_path, rel_path)
+            pending.append((entry, full_path, known_entry is None, cursor.submitted(rel_path)))
+            if len(pending) >= window:
+                submit_pending()
 
         except Exception as e:
             print(f"⚠️ Error processing {rel_path}: {e}")
-
-    # Reconcile deletions (works with relative paths)
-    df = reconcile_missing(df, existing_paths, mode)
-
-    # Final save
-    save_registry(df, pickle_path)
+            cursor.walked(rel_path)
+    submit_pending()
+    if stats is not None:
+        stats.add("lookup", lookup_sec, calls=n_files)
+    return n_files, skipped, unstatted
+
+
+def _prunes(incremental: Union[bool, Iterable[str]], mode: str) -> bool:
+    """Whether the root of this mode skips unchanged directories (see scan_folder)."""
+    if isinstance(incremental, bool):
+        return incremental
+    if isinstance(incremental, str):
+        return mode == incremental
+    return mode in incremental
+
+
+class RootScan:
+    """Walk state of one root (mode) in a scan_roots run."""
+
+    def __init__(self, mode: str, folder_path: str, index: PathIndex, resume: bool):
+        self.mode = mode
+        self.folder_path = folder_path
+        self.root = os.path.abspath(folder_path)
+        # rel_path -> FileMeta for this mode, kept current by update_registry
+        self.known = index.setdefault(mode, {})
+        # copied so a checkpoint mid-walk never persists half-updated fingerprints
+        self.fingerprints = dict(index.fingerprints.get(mode, {}))
+        cursor = index.cursors.get(mode)
+        self.resume_after = cursor[1] if resume and cursor and cursor[0] == self.root else None
+        self.cursor = ScanCursor(self.resume_after)
+        self.existing_paths: Set[str] = set()
+        self.n_files = 0
+        self.skipped = 0
+        self.unstatted = 0
+
+    def walk(self, writer: RegistryWriter, workers: int, deep: bool, algorithms, hash_cache,
+             position: int = 0, stop: Optional[threading.Event] = None,
+             read_order: Optional[str] = None) -> None:
+        """Walk the root and feed its own hash pool; runs in its own thread."""
+        if self.resume_after is not None:
+            print(f"↩️ Resuming {self.mode} scan after {self.resume_after}")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"hash-{self.mode}") as pool:
+            # files stream in from the walker, so hashing starts before the walk ends
+            walker = timed_iter(iter_files(self.folder_path, self.fingerprints, deep, self.resume_after),
+                                writer.stats, "walk")
+            bar = tqdm(walker, desc=f"Scanning {self.mode}", unit="file", position=position)
+            if writer.stats is not None:
+                writer.stats.attach(bar)
+            self.n_files, self.skipped, self.unstatted = feed_hash_pool(
+                self.folder_path, self.mode, bar,
+                self.known, writer, self.cursor, pool, algorithms, hash_cache, self.existing_paths,
+                stop=stop, read_order=read_order,
+            )
+
+    def finish(self, df: pd.DataFrame) -> pd.DataFrame:
+        """After a complete walk: store fingerprints, clear the cursor, retire missing files."""
+        index = get_path_index(df)
+        if self.resume_after is not None:
+            # files before the cursor were handled by the interrupted run
+            resume_key = walk_key(self.resume_after)
+            resumed = [p for p in self.known if walk_key(p) <= resume_key]
+            self.existing_paths.update(resumed)
+            self.n_files += len(resumed)
+            self.skipped += len(resumed)
+
+        index.cursors.pop(self.mode, None)
+        index.fingerprints[self.mode] = self.fingerprints
+        index.fingerprints_changed.add(self.mode)
+
+        # Reconcile deletions (works with relative paths)
+        return reconcile_missing(df, self.existing_paths, self.mode)
+
+
+def scan_roots(
+    df: pd.DataFrame,
+    pickle_path: str,
+    roots: Dict[str, str],
+    save_every_n: int = 500,
+    save_every_sec: int = 300,
+    workers: int = 1,
+    queue_size: int = 256,
+    incremental: Union[bool, Iterable[str]] = False,
+    algorithms: Tuple[str, ...] = DEFAULT_ALGORITHMS,
+    use_hash_cache: bool = True,
+    resume: bool = True,
+    read_order: Optional[str] = None,
+    stats: Optional[ScanStats] = None,
+    metrics_path: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Scan several roots at once into one registry.
+    roots: mode -> folder, e.g. {"prod": PROD_PATH, "raw": RAW_PATH, "box": BOX_PATH}.
+    Any mode name works; its filename_in_<mode>/historical_<mode> columns are
+    added on first use. Each root is walked by its own thread with its own pool
+    of `workers` hashing threads, so roots on different drives don't wait on
+    each other; every result goes through the single RegistryWriter and journal.
+    incremental: True or a collection of modes (e.g. ("raw",) for a write-once
+          archive) whose roots skip unchanged directories; see scan_folder.
+    Other parameters as in scan_folder (queue_size is per root).
+    """
+    stats = stats if stats is not None else ScanStats("scan " + ",".join(roots))
+    algorithms = ("md5",) + tuple(a for a in algorithms if a != "md5")
+    hash_cache = get_hash_cache() if use_hash_cache else None
+    for mode in roots:
+        df = ensure_mode_columns(df, mode)
+    index = get_path_index(df)
+    scans = [RootScan(mode, folder_path, index, resume) for mode, folder_path in roots.items()]
+
+    journal = ScanJournal(ScanJournal.path_for(pickle_path))
+    try:
+        writer = RegistryWriter(df, pickle_path, save_every_n, save_every_sec,
+                                queue_size * len(scans), journal, stats)
+        for scan in scans:
+            writer.track(scan.mode, scan.root, scan.cursor)
+        writer.start()
+        stop = threading.Event()
+        try:
+            with ThreadPoolExecutor(max_workers=len(scans), thread_name_prefix="scan-root") as root_pool:
+                futures = [
+                    root_pool.submit(scan.walk, writer, workers, not _prunes(incremental, scan.mode),
+                                     algorithms, hash_cache, i, stop, read_order)
+                    for i, scan in enumerate(scans)
+                ]
+                try:
+                    for future in futures:
+                        future.result()
+                except BaseException:
+                    stop.set()  # let the other roots wind down before the writer closes
+                    raise
+        finally:
+            df = writer.close()
+            if hash_cache is not None:
+                hash_cache.flush()
+        if writer.error is not None:
+            raise writer.error
+
+        with stats.phase("reconcile"):
+            for scan in scans:
+                df = scan.finish(df)
+
+        # Final save, then drop the journaled results it now contains
+        with stats.phase("final_save"):
+            save_registry(df, pickle_path)
+            journal.compact(get_path_index(df).cursors)
+    finally:
+        journal.close()
+        stats.finish()
+
+    for scan in scans:
+        stats.count(scan.mode, "files_seen", scan.n_files)
+        stats.count(scan.mode, "skipped", scan.skipped)
+        stats.count(scan.mode, "unstatted", scan.unstatted)
+        stats.count(scan.mode, "rehashed", writer.rehashed[scan.mode])
+        stats.count(scan.mode, "new", writer.new[scan.mode])
+    if metrics_path:
+        stats.write_jsonl(metrics_path)
 
     # Summary
-    print(f"\n=== Scan Summary ({mode}) ===")
-    print(f"Total files seen: {n_files}")
-    print(f"Skipped (unchanged): {skipped}")
-    print(f"Rehashed (modified): {rehashed}")
-    print(f"New files: {new}")
-    print(f"Missing files moved to history: handled by reconcile_missing()")
-    print("============================\n")
+    for scan in scans:
+        print(f"\n=== Scan Summary ({scan.mode}) ===")
+        print(f"Total files seen: {scan.n_files}")
+        print(f"Skipped (unchanged): {scan.skipped}")
+        if scan.unstatted:
+            print(f"  of which not stat'ed (directory unchanged): {scan.unstatted}"
+                  f" - in-place edits there are only caught by a full scan")
+        print(f"Rehashed (modified): {writer.rehashed[scan.mode]}")
+        print(f"New files: {writer.new[scan.mode]}")
+        print(f"Missing files moved to history: handled by reconcile_missing()")
+        print("============================\n")
+    print(stats.summary())
 
     return df
 
 
+def scan_folder(
+    folder_path: str,
+    df: pd.DataFrame,
+    mode: str,
+    pickle_path: str,
+    save_every_n: int = 500,
+    save_every_sec: int = 300,
+    workers: int = 1,
+    queue_size: int = 256,
+    incremental: Union[bool, Iterable[str]] = False,
+    algorithms: Tuple[str, ...] = DEFAULT_ALGORITHMS,
+    use_hash_cache: bool = True,
+    resume: bool = True,
+    read_order: Optional[str] = None,
+    stats: Optional[ScanStats] = None,
+    metrics_path: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Scan a folder (recursive), updating registry DataFrame.
+    mode: "prod", "raw" or any other root name (see scan_roots)
+    workers: number of threads hashing new/changed files concurrently
+    queue_size: max files hashed or waiting for the registry writer at once
+    incremental: skip the per-file stat in directories whose fingerprint
+          (mtime, entry count, names) is unchanged since the last scan. Much
+          faster on large archives, but a file edited in place in an otherwise
+          untouched directory is not noticed, so only use it for roots whose
+          files are never modified (the summary counts the files passed this way).
+    algorithms: digests computed per hashed file in the same read, e.g.
+          ("md5", "blake2b"); md5 is always included as the registry key.
+          The other digests are recorded per row in the digests column.
+    use_hash_cache: consult/fill the shared stat-keyed hash cache (functions.hash_cache)
+          so other tools can reuse these hashes.
+    resume: if an earlier scan of this same folder was interrupted, continue
+          after its journaled cursor instead of walking from the start.
+    read_order: "inode" or "extent" hashes files in on-disk order instead of
+          walk order; for cold archives on spinning disks.
+    stats: ScanStats to fill with per-phase timings, bytes hashed, checkpoint
+          durations and peak RSS (one is created and summarized if omitted).
+    metrics_path: append the stats as one JSON line to this file.
+    Every hashed file is journaled to <pickle_path>.journal as it arrives, so a
+    killed scan loses nothing; load_registry replays the journal.
+    """
+    return scan_roots(df, pickle_path, {mode: folder_path}, save_every_n, save_every_sec,
+                      workers, queue_size, incremental, algorithms, use_hash_cache, resume, read_order,
+                      stats, metrics_path)
+
+
 
 
 def update_registry_v1(
@@ -300,35 +1041,145 @@ def update_registry_v1(
 
     return df
 
-def update_registry(df, md5, path, mode, size, mtime):
-    active_col = f"filename_in_{mode}"
+def ensure_mode_columns(df: pd.DataFrame, mode: str) -> pd.DataFrame:
+    """Add empty filename_in_<mode>/historical_<mode> columns for a new mode."""
+    if not mode or "\0" in mode:
+        raise ValueError(f"invalid mode name {mode!r}")
+    index = get_path_index(df)
+    if index.subset:
+        raise ValueError("registry was loaded for selected hashes only; load it in full to update it")
+    if index.modes is not None and mode not in index.modes:
+        raise ValueError(f"registry was loaded for mode(s) {', '.join(index.modes)} only; "
+                         f"load it with {mode!r} to update that mode")
+    for col in (f"filename_in_{mode}", f"historical_{mode}"):
+        if col not in df.columns:
+            df[col] = pd.Series([EMPTY_SET] * len(df), index=df.index, dtype=object)
+    index.setdefault(mode, {})
+    return df
 
-    if md5 not in df.index:
-        df.loc[md5] = [
-            set() if mode == "raw" else set(),
-            set() if mode == "prod" else set(),
-            set(),
-            set(),
-            {},   # file_metadata
-        ]
 
-    # add to active set
-    s = df.at[md5, active_col]
-    if not isinstance(s, set):
-        s = set()
-    s.add(path)
-    df.at[md5, active_col] = s
+def _empty_cell(col: str):
+    return EMPTY_DICT if col in ("file_metadata", "digests") else EMPTY_SET
+
+
+def _writable(value, col: str):
+    """A live set/dict for a cell: value itself, or a fresh copy of a shared/missing one."""
+    if col in ("file_metadata", "digests"):
+        return value if isinstance(value, dict) else dict(value) if isinstance(value, Mapping) else {}
+    return value if isinstance(value, set) else set(value) if isinstance(value, frozenset) else set()
 
-    # update file_metadata
-    meta = df.at[md5, "file_metadata"]
-    if not isinstance(meta, dict):
-        meta = {}
-    meta[path] = (size, mtime, datetime.now(timezone.utc))
-    df.at[md5, "file_metadata"] = meta
 
+_UNREAD = object()
+
+
+def _new_rows_frame(df: pd.DataFrame, new_rows: Dict[str, dict]) -> pd.DataFrame:
+    """DataFrame of collected new rows, with df's columns (cells of later-added modes empty)."""
+    return pd.DataFrame(
+        {col: [r.get(col, _empty_cell(col)) for r in new_rows.values()] for col in df.columns},
+        index=pd.Index(list(new_rows), name=df.index.name),
+        dtype=object,
+    )
+
+
+def append_new_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Append the rows collected by update_registry_batch(defer_new=True) to df, in one concat."""
+    index = get_path_index(df)
+    if not index.new_rows:
+        return df
+    new_df = _new_rows_frame(df, index.new_rows)
+    index.new_rows = {}
+    attrs = df.attrs
+    df = new_df if df.empty else pd.concat([df, new_df])
+    df.attrs.update(attrs)
     return df
 
 
+def update_registry_batch(df: pd.DataFrame, updates: List[RegistryUpdate],
+                          defer_new: bool = False) -> pd.DataFrame:
+    """
+    Apply many file updates at once. Existing rows are mutated in place (their
+    sets/dicts are shared with the DataFrame); hashes not yet in the registry
+    are collected in plain dicts on the path index and added with a single
+    concat. Empty cells share EMPTY_SET / EMPTY_DICT and only get their own
+    set/dict when written.
+    defer_new: keep collecting new rows across batches instead of appending
+    them now (save_registry writes them from there); a scan appends them once
+    at the end with append_new_rows. Growing the frame on every checkpoint
+    would copy it, and rebuild its index, each time.
+    """
+    if not updates:
+        return df
+
+    for mode in {u.mode for u in updates}:
+        df = ensure_mode_columns(df, mode)
+    index = get_path_index(df)
+    now = datetime.now(timezone.utc)
+    columns = list(df.columns)
+    rows: Dict[str, dict] = {}      # md5 -> {col: live cell}, cells of existing rows read so far
+    new_rows = index.new_rows       # md5 -> {col: cell}, rows to append
+    replaced: Set[Tuple[str, str]] = set()  # (md5, col) cells of existing rows that got a new set/dict
+
+    def cell(md5: str, col: str, create: bool = True):
+        """Writable set/dict of one cell; None if md5 is not in the registry and not create."""
+        r = new_rows.get(md5)
+        if r is None:
+            r = rows.get(md5)
+            if r is None:
+                if md5 in df.index:
+                    r = rows[md5] = {}
+                elif create:
+                    r = new_rows[md5] = {c: _empty_cell(c) for c in columns}
+                else:
+                    return None
+        value = r.get(col, _UNREAD)
+        if value is _UNREAD:
+            # a column added since the row was collected is still empty there
+            value = _empty_cell(col) if md5 in new_rows else df.at[md5, col]
+        live = _writable(value, col)
+        if live is not value or col not in r:
+            r[col] = live
+            if live is not value and md5 in rows:
+                replaced.add((md5, col))
+        return live
+
+    for u in updates:
+        active_col = f"filename_in_{u.mode}"
+        historical_col = f"historical_{u.mode}"
+        known = index.setdefault(u.mode, {})
+
+        # content at this path changed: retire it from the row of its previous hash
+        previous = known.get(u.path)
+        if previous is not None and previous.md5 != u.md5:
+            old_active = cell(previous.md5, active_col, create=False)
+            if old_active is not None:
+                old_active.discard(u.path)
+                cell(previous.md5, historical_col).add((u.path, now))
+                cell(previous.md5, "file_metadata").pop(u.path, None)
+                if index.dirty is not None:
+                    index.dirty.add(previous.md5)
+
+        cell(u.md5, active_col).add(u.path)
+        record = FileMeta(u.md5, u.size, u.mtime, now)
+        cell(u.md5, "file_metadata")[u.path] = record
+        # md5 is the row key; only other algorithms are kept in the digests cell
+        extra = {a: v for a, v in (u.digests or {}).items() if a != "md5"}
+        if extra and "digests" in columns:
+            cell(u.md5, "digests").update(extra)
+
+        known[u.path] = record
+        if index.dirty is not None:
+            index.dirty.add(u.md5)
+
+    for md5, col in replaced:
+        df.at[md5, col] = rows[md5][col]
+
+    return df if defer_new else append_new_rows(df)
+
+
+def update_registry(df, md5, path, mode, size, mtime):
+    return update_registry_batch(df, [RegistryUpdate(md5, path, mode, size, mtime)])
+
+
 def reconcile_missing_v1(df: pd.DataFrame, existing_paths: Set[str], mode: str) -> pd.DataFrame:
     """Move missing files from active set to historical set with timestamp."""
     active_col = f"filename_in_{mode}"
@@ -351,54 +1202,270 @@ def reconcile_missing_v1(df: pd.DataFrame, existing_paths: Set[str], mode: str)
     return df
 
 def reconcile_missing(df, existing_paths, mode):
+    """
+    Move files that were not seen in this scan from the active set to the
+    historical set. Deletions are one set difference against the path index,
+    and only the rows that lost a path are touched.
+    """
+    known = get_path_index(df).setdefault(mode, {})
+    removed = known.keys() - existing_paths
+    if not removed:
+        return df
+    return retire_paths(df, removed, mode)
+
+
+def retire_paths(df: pd.DataFrame, paths: Iterable[str], mode: str) -> pd.DataFrame:
+    """Move these active paths of one mode to the historical set with a timestamp."""
     active_col = f"filename_in_{mode}"
     historical_col = f"historical_{mode}"
     now = datetime.now(timezone.utc)
-
-    for md5, row in df.iterrows():
-        active = row[active_col] if isinstance(row[active_col], set) else set()
-        hist = row[historical_col] if isinstance(row[historical_col], set) else set()
-        meta = row["file_metadata"] if isinstance(row["file_metadata"], dict) else {}
-
-        removed = {p for p in active if p not in existing_paths}
-        if removed:
-            for r in removed:
-                hist.add((r, now))
+    index = get_path_index(df)
+    known = index.setdefault(mode, {})
+
+    removed_by_md5: Dict[str, List[str]] = {}
+    for r in paths:
+        entry = known.pop(r, None)
+        if entry is not None:
+            removed_by_md5.setdefault(entry.md5, []).append(r)
+
+    for md5, paths in removed_by_md5.items():
+        if md5 not in df.index:
+            continue
+        active = df.at[md5, active_col]
+        hist = df.at[md5, historical_col]
+        meta = df.at[md5, "file_metadata"]
+
+        if isinstance(active, set):
+            active.difference_update(paths)
+        if not isinstance(hist, set):
+            hist = _writable(hist, historical_col)
+            df.at[md5, historical_col] = hist
+        hist.update((r, now) for r in paths)
+        if isinstance(meta, dict):
+            for r in paths:
                 meta.pop(r, None)  # drop metadata for missing file
-            active -= removed
 
-        df.at[md5, active_col] = active
-        df.at[md5, historical_col] = hist
-        df.at[md5, "file_metadata"] = meta
+        if index.dirty is not None:
+            index.dirty.add(md5)
 
     return df
 # ==============================
 # Convenience Wrappers
 # ==============================
 
-def scan_raw(df: pd.DataFrame, pickle_path: str, raw_path: str) -> pd.DataFrame:
-    return scan_folder(raw_path, df, "raw", pickle_path)
+def scan_raw(df: pd.DataFrame, pickle_path: str, raw_path: str, **scan_kwargs) -> pd.DataFrame:
+    return scan_folder(raw_path, df, "raw", pickle_path, **scan_kwargs)
+
+
+def scan_prod(df: pd.DataFrame, pickle_path: str, prod_path: str, **scan_kwargs) -> pd.DataFrame:
+    return scan_folder(prod_path, df, "prod", pickle_path, **scan_kwargs)
+
+
+# ==============================
+# Watch Mode
+# ==============================
+
+def apply_watch_events(
+    df: pd.DataFrame,
+    roots: Dict[str, str],
+    changes: Dict[Tuple[str, str], str],
+    workers: int = 1,
+    algorithms: Tuple[str, ...] = DEFAULT_ALGORITHMS,
+    hash_cache: Optional[HashCache] = None,
+) -> Tuple[pd.DataFrame, int, int]:
+    """
+    Bring the registry up to date with one debounced batch of watch events.
+    changes: (mode, rel_path) -> CHANGED / DELETED / DELETED_DIR, latest event per path.
+    Every path is re-stat'd: files are hashed only if size/mtime differ from the
+    path index, and paths that no longer exist are retired like reconcile_missing.
+    Returns (df, files hashed, paths retired).
+    """
+    index = get_path_index(df)
+    to_hash: List[Tuple[str, FileEntry, str]] = []
+    present: Set[Tuple[str, str]] = set()
+    gone: Dict[str, Set[str]] = {}
+
+    for (mode, rel_path), kind in changes.items():
+        known = index.setdefault(mode, {})
+        if kind == DELETED_DIR:
+            prefix = rel_path + "/"
+            gone.setdefault(mode, set()).update(p for p in known if p.startswith(prefix))
+            continue
+        full_path = os.path.join(roots[mode], rel_path)
+        try:
+            st = os.stat(full_path)
+        except FileNotFoundError:
+            gone.setdefault(mode, set()).add(rel_path)
+            continue
+        except OSError as e:
+            print(f"⚠️ Error processing {rel_path}: {e}")
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            continue
+        present.add((mode, rel_path))
+        entry = FileEntry(rel_path, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
+        known_entry = known.get(rel_path)
+        if known_entry is not None and known_entry.size == entry.size and known_entry.mtime == entry.mtime:
+            continue
+        to_hash.append((mode, entry, full_path))
+
+    def job(item):
+        mode, entry, full_path = item
+        try:
+            digests = hash_entry(entry, full_path, algorithms, hash_cache)
+        except Exception as e:
+            print(f"⚠️ Error hashing {entry.rel_path}: {e}")
+            return None
+        return RegistryUpdate(digests["md5"], entry.rel_path, mode, entry.size, entry.mtime, digests)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        updates = [u for u in pool.map(job, to_hash) if u is not None]
+    df = update_registry_batch(df, updates)
 
+    retired = 0
+    for mode, paths in gone.items():
+        # a directory replaced within the batch may have re-created some of its files
+        paths = {p for p in paths if (mode, p) not in present}
+        retired += len(paths)
+        df = retire_paths(df, paths, mode)
+    return df, len(updates), retired
 
-def scan_prod(df: pd.DataFrame, pickle_path: str, prod_path: str) -> pd.DataFrame:
-    return scan_folder(prod_path, df, "prod", pickle_path)
+
+def watch_folders(
+    df: pd.DataFrame,
+    pickle_path: str,
+    roots: Dict[str, str],
+    debounce_sec: float = 2.0,
+    max_delay_sec: float = 30.0,
+    workers: int = 1,
+    algorithms: Tuple[str, ...] = DEFAULT_ALGORITHMS,
+    use_hash_cache: bool = True,
+    initial_scan: bool = True,
+    **scan_kwargs,
+) -> pd.DataFrame:
+    """
+    Keep the registry current from Linux inotify events instead of periodic full scans.
+    roots: mode -> folder, e.g. {"prod": PROD_PATH, "raw": RAW_PATH}
+    Events are collected until debounce_sec pass without a new one (or max_delay_sec
+    since the first), then the batch goes through apply_watch_events and the
+    registry is saved. Watches are set up before the initial scan, so nothing
+    changed during it is missed. If the kernel event queue overflows, the roots
+    are rescanned in full (not incremental). Runs until Ctrl+C.
+    """
+    algorithms = ("md5",) + tuple(a for a in algorithms if a != "md5")
+    hash_cache = get_hash_cache() if use_hash_cache else None
+    scan_kwargs.update(workers=workers, algorithms=algorithms, use_hash_cache=use_hash_cache)
+
+    watcher = TreeWatcher()
+    changes: Dict[Tuple[str, str], str] = {}
+
+    def flush():
+        nonlocal df
+        batch = dict(changes)
+        changes.clear()
+        df, hashed, retired = apply_watch_events(df, roots, batch, workers, algorithms, hash_cache)
+        if hashed or retired:
+            save_registry(df, pickle_path)
+            print(f"🔄 {len(batch)} events: {hashed} hashed, {retired} moved to history")
+
+    try:
+        for mode, root in roots.items():
+            n_dirs = watcher.add_root(mode, root)
+            print(f"👀 Watching {n_dirs} directories under {root} ({mode})")
+        if initial_scan:
+            df = scan_roots(df, pickle_path, roots, **scan_kwargs)
+
+        first = last = 0.0
+        while True:
+            timeout = None
+            if changes:
+                timeout = max(0.0, min(last + debounce_sec, first + max_delay_sec) - time.monotonic())
+            events = watcher.read(timeout)
+            now = time.monotonic()
+
+            overflowed = [e.name for e in events if e.kind == OVERFLOW]
+            for e in events:
+                if e.kind == OVERFLOW:
+                    continue
+                if not changes:
+                    first = now
+                changes[(e.name, e.rel_path)] = e.kind
+                last = now
+
+            if overflowed:
+                print("⚠️ Watch event queue overflowed; rescanning")
+                flush()
+                df = scan_roots(df, pickle_path, {mode: roots[mode] for mode in overflowed},
+                                **dict(scan_kwargs, incremental=False))
+            elif changes and (now - last >= debounce_sec or now - first >= max_delay_sec):
+                flush()
+    except KeyboardInterrupt:
+        print("🛑 Watch stopped")
+    finally:
+        if changes:
+            flush()
+        watcher.close()
+        if hash_cache is not None:
+            hash_cache.flush()
+    return df
 
 
 # ==============================
 # Example Usage
 # ==============================
 if __name__ == "__main__":
-    import settings  # you maintain this file with RAW_PATH, PROD_PATH, PICKLE_PATH
+    import argparse
 
+    #import settings  # you maintain this file with RAW_PATH, PROD_PATH, PICKLE_PATH
     #df = load_registry(settings.PICKLE_PATH)
 
-    
-
-    pickle_path = "pickle.pkl"
-    raw_to_scan = r"F:\TF1\Pandryn\Raw"
-    prod_to_scan = r"D:\Pandryn\Pandryn_Box"
-    
-
-    df = load_registry(pickle_path)    
-    df = scan_prod(df, pickle_path, prod_to_scan)
-    df = scan_raw(df, pickle_path, raw_to_scan)
+    parser = argparse.ArgumentParser(description="Scan prod, raw and other named roots into the md5 registry.")
+    parser.add_argument("--registry", default="registry.db", help="registry database path")
+    parser.add_argument("--prod", default=r"D:\Pandryn\Pandryn_Box", help="production root to scan")
+    parser.add_argument("--raw", default=r"F:\TF1\Pandryn\Raw", help="raw archive root to scan")
+    parser.add_argument("--root", action="append", default=[], metavar="MODE=PATH",
+                        help="extra root to scan in parallel under its own mode (repeatable), e.g. box=E:\\Box")
+    parser.add_argument("--workers", type=int, default=1, help="hashing threads per root")
+    parser.add_argument("--incremental", action="append", default=[], metavar="MODE",
+                        help="skip unchanged directories of this root without a per-file stat (repeatable); "
+                             "only for write-once roots such as raw, as in-place edits there go unnoticed")
+    parser.add_argument("--read-order", choices=READ_ORDERS, default=None,
+                        help="hash in on-disk order (inode number or FIEMAP extent) to cut HDD seeks")
+    parser.add_argument("--max-mbps", type=float, default=None, help="cap hashing reads at this many MB/s")
+    parser.add_argument("--max-iops", type=float, default=None, help="cap hashing reads at this many reads/s")
+    parser.add_argument("--throttle-file", default=None,
+                        help="control file polled for new mb_per_sec / iops limits while running "
+                             "(SIGUSR1 halves, SIGUSR2 doubles the limits)")
+    parser.add_argument("--metrics", default=None, help="append per-scan timing metrics (JSON lines) to this file")
+    parser.add_argument("--watch", action="store_true",
+                        help="after scanning, keep the registry current from filesystem events (Linux)")
+    parser.add_argument("--debounce", type=float, default=2.0,
+                        help="seconds without new events before a watch batch is applied")
+    args = parser.parse_args()
+
+    pickle_path = args.registry
+    raw_to_scan = args.raw
+    prod_to_scan = args.prod
+
+    roots = {"prod": prod_to_scan, "raw": raw_to_scan}
+    for spec in args.root:
+        mode, sep, path = spec.partition("=")
+        if not sep or not mode or not path:
+            parser.error(f"--root expects MODE=PATH, got {spec!r}")
+        roots[mode] = path
+
+    if args.max_mbps or args.max_iops or args.throttle_file:
+        governor = IOGovernor(args.max_mbps, args.max_iops, args.throttle_file)
+        governor.install_signal_handlers()
+        install_governor(governor)
+
+    # only the scanned modes are read; any other mode in the registry stays on disk untouched
+    df = load_registry(pickle_path, modes=tuple(roots))
+    if args.watch:
+        df = watch_folders(df, pickle_path, roots,
+                           debounce_sec=args.debounce, workers=args.workers, incremental=args.incremental,
+                           read_order=args.read_order, metrics_path=args.metrics)
+    else:
+        # roots usually sit on different drives, so they are walked in parallel
+        df = scan_roots(df, pickle_path, roots, workers=args.workers, incremental=args.incremental,
+                        read_order=args.read_order, metrics_path=args.metrics)
@@ -1,12 +1,15 @@
 from pandasgui import show
-import pickle as pickle 
+from md5_manager import load_registry
 
-pickle_file = "pickle.pkl"
+pickle_file = "registry.db"
 
 
-# Open and load the pickle
-with open(pickle_file, "rb") as f:
-    data = pickle.load(f)
+# Load the registry database
+data = load_registry(pickle_file)
+
+# Only need one mode or a few hashes? Load just that part:
+#data = load_registry(pickle_file, modes=("prod",))
+#data = load_registry(pickle_file, md5s=["<md5>"])
 
 # If you want to view the dataframe in pandasgui:
 #from pandasgui import show
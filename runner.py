@@ -1,9 +1,9 @@
-from md5_manager import scan_raw, scan_prod, scan_folder
-import pandas as pd
+from md5_manager import load_registry, scan_roots
+from x_settings import PICKLE_PATH
 
-pickle_path = "pickle.pkl"
 raw_path = r"F:\TF1\Pandryn\Raw\Sao Daily Dump"
 
 
-dataframe = pd.DataFrame
-scan_raw(raw_path=raw_path, pickle_path=pickle_path, df=dataframe)
\ No newline at end of file
+dataframe = load_registry(PICKLE_PATH, modes=("raw",))
+# raw is write-once, so unchanged dump folders are skipped without a stat per file
+scan_roots(dataframe, PICKLE_PATH, {"raw": raw_path}, incremental=("raw",))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the toolkit is run from the repository root (functions.* imports), so tests are too
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
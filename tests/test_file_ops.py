@@ -0,0 +1,90 @@
+import os
+import random
+
+import pytest
+
+from functions.file_ops import OpPlan, execute_plan, resume_journal, undo_journal
+
+
+def snapshot(root):
+    """rel_path -> content of every file under root."""
+    files = {}
+    for base, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(base, name)
+            with open(path, encoding="utf-8") as f:
+                files[os.path.relpath(path, root)] = f.read()
+    return files
+
+
+def random_renames(root, rng, n_files=300, n_dirs=4):
+    """
+    Create n_files files across n_dirs folders and a random src -> dst mapping
+    over them: permutations (rename cycles), chains into new names, two sources
+    claiming one destination, and destinations held by files that stay put.
+    """
+    dirs = [os.path.join(root, f"d{i}") for i in range(n_dirs)]
+    for d in dirs:
+        os.makedirs(d)
+    paths = [os.path.join(rng.choice(dirs), f"IMG_{i:04d}.jpg") for i in range(n_files)]
+    for p in paths:
+        with open(p, "w", encoding="utf-8") as f:
+            f.write(os.path.basename(p))
+
+    rng.shuffle(paths)
+    cycle, chain, rest = paths[:120], paths[120:200], paths[200:]
+    renames = list(zip(cycle, cycle[1:] + cycle[:1]))                       # one big cycle
+    renames += [(src, os.path.join(rng.choice(dirs), f"NEW_{i:04d}.jpg"))  # into fresh names...
+                for i, src in enumerate(chain)]
+    renames += [(src, renames[-1][1]) for src in rest[:5]]                # ...one claimed again
+    renames += [(src, rng.choice(rest[50:])) for src in rest[5:30]]       # onto files that stay
+    rng.shuffle(renames)
+    return renames
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rename_many_execute_undo_round_trip(tmp_path, seed):
+    rng = random.Random(seed)
+    root = str(tmp_path / "tree")
+    renames = random_renames(root, rng)
+    before = snapshot(root)
+
+    plan = OpPlan()
+    final = plan.rename_many(renames)
+    assert plan.parked >= 1
+
+    journal = str(tmp_path / "journal.jsonl")
+    result = execute_plan(plan, journal_path=journal, workers=4)
+    assert not result.failed
+
+    # every planned rename carried its file's content; nothing else changed or was lost
+    expected = dict(before)
+    moved = {src: dst for src, dst in final.items() if dst is not None and src != dst}
+    for src in moved:
+        expected.pop(os.path.relpath(src, root))
+    for src, dst in moved.items():
+        expected[os.path.relpath(dst, root)] = before[os.path.relpath(src, root)]
+    assert snapshot(root) == expected
+    assert all(final[src] is None for src, _ in plan.skipped)
+    assert len(moved) + len(plan.skipped) == len(renames)
+
+    undo = undo_journal(journal, workers=4)
+    assert not undo.failed
+    assert snapshot(root) == before
+
+
+def test_resume_never_claims_a_failed_move(tmp_path):
+    # the source vanished and an unrelated file took the destination
+    src, dst = str(tmp_path / "a"), str(tmp_path / "b")
+    (tmp_path / "a").write_text("A")
+    plan = OpPlan()
+    plan.move(src, dst)
+    os.remove(src)
+    (tmp_path / "b").write_text("unrelated")
+
+    journal = str(tmp_path / "journal.jsonl")
+    assert len(execute_plan(plan, journal_path=journal).failed) == 1
+    assert resume_journal(journal).done == 0
+    assert undo_journal(journal).done == 0
+    assert sorted(os.listdir(tmp_path)) == ["b", "journal.jsonl"]
+    assert (tmp_path / "b").read_text() == "unrelated"
@@ -1 +1 @@
-PICKLE_PATH = "pickle.pkl"
\ No newline at end of file
+PICKLE_PATH = "registry.db"
\ No newline at end of file